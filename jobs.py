@@ -0,0 +1,80 @@
+# jobs.py
+# Streamlit 밖에서(헤드리스) 실행하는 정기 작업
+#
+#   python jobs.py archive [--days 30] [--chunk 500]
+#   python jobs.py rollover
+#   python jobs.py bench [--weeks 1 10 50] [--students 20]   (DB 연결 없이 실행, 속도만 측정)
+#   (결과가 원래 대시보드 집계와 같은지는 tests/test_dashboard_stats.py 에서 확인)
+#
+# 예) 매일 새벽 4시 로그 정리 (crontab)
+#   0 4 * * * cd /path/to/english-oracle-v3 && python jobs.py archive >> jobs.log 2>&1
+# 예) 매주 월요일 09:05 (KST) 지난 주 마감 (crontab, 서버 시간대가 KST 가 아니면 CRON_TZ 지정)
+#   CRON_TZ=Asia/Seoul
+#   5 9 * * 1 cd /path/to/english-oracle-v3 && python jobs.py rollover >> jobs.log 2>&1
+import argparse
+import random
+import time
+from datetime import datetime
+from modules import bench, db, homework, weeks
+
+def run_archive(args):
+    return db.archive_old_logs(days=args.days, chunk_rows=args.chunk)
+
+def run_rollover(args):
+    return homework.rollover_weekly_history()
+
+# ---------------------------------------------------------
+# 통계 집계 벤치마크: 원래 대시보드 집계(modules/bench.py) vs db 의 열 단위 집계 (학생 1명)
+# - 원래 집계는 그릴 때마다 시트 레코드부터, 열 단위 집계는 세대당 1번 정규화된 프레임(스냅샷)부터
+# ---------------------------------------------------------
+BENCH_SOURCES = ["Homework_List", "Homework_Log", "Exam_Results", "Weekly_History"]
+
+def _timed(fn, inputs):
+    started = time.perf_counter()
+    for data in inputs: fn(data)
+    return (time.perf_counter() - started) / len(inputs) * 1000
+
+def run_bench(args):
+    rng = random.Random(0)
+    this_week_id = weeks.current_week_id()
+    week_start = weeks.week_start(this_week_id)
+    lines = []
+    for n_weeks in args.weeks:
+        inputs = [bench.bench_records(rng, n_weeks, this_week_id) for _ in range(args.students)]
+        frames = [[db.normalize_frame(name, records[name]) for name in BENCH_SOURCES] for records in inputs]
+        def original(records):
+            return bench.original_dashboard_stats("1", *(records[name] for name in BENCH_SOURCES), week_start)
+        def columnar(frame):
+            missions, logs, exams, history = frame
+            return db._history_stats(history), db._live_stats(missions, logs, exams, this_week_id)
+        t_orig = _timed(original, inputs)
+        t_vec = _timed(columnar, frames)
+        lines.append(f"{n_weeks:>3}주: 원래 집계 {t_orig:7.2f} ms -> 열 단위 {t_vec:6.2f} ms (x{t_orig / max(t_vec, 1e-9):.1f}, 학생당)")
+    return "\n" + "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="THE ORACLE 정기 작업")
+    sub = parser.add_subparsers(dest="job", required=True)
+
+    p_archive = sub.add_parser("archive", help="오래된 Homework_Log 기록을 Log_Archive 로 이동")
+    p_archive.add_argument("--days", type=int, default=30, help="이 일수보다 오래된 기록을 이동 (기본 30)")
+    p_archive.add_argument("--chunk", type=int, default=db.ARCHIVE_CHUNK_ROWS, help="한 번에 읽고 옮길 최대 행 수")
+    p_archive.set_defaults(func=run_archive)
+
+    p_rollover = sub.add_parser("rollover", help="모든 학생의 지난 주를 Weekly_History 로 마감 (중복 실행 안전)")
+    p_rollover.set_defaults(func=run_rollover)
+
+    p_bench = sub.add_parser("bench", help="대시보드 통계 집계 속도 측정 (원래 집계 vs 열 단위)")
+    p_bench.add_argument("--weeks", type=int, nargs="+", default=[1, 10, 50], help="지난 기록 주 수 (여러 개)")
+    p_bench.add_argument("--students", type=int, default=20, help="주 수마다 만들 학생 수")
+    p_bench.set_defaults(func=run_bench, offline=True)
+
+    args = parser.parse_args()
+    if db.doc is None and not getattr(args, "offline", False):
+        print("DB 연결 실패: .streamlit/secrets.toml 의 gcp_service_account 를 확인하세요.")
+        raise SystemExit(1)
+    result = args.func(args)
+    print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] {args.job}: {result}")
+
+if __name__ == "__main__":
+    main()
@@ -2,27 +2,56 @@
 
 import streamlit as st
 import pandas as pd
+import numpy as np
 import time
-from datetime import datetime, timedelta
-import pytz
-from modules import db
+from modules import db, weeks
 
-# [Helper] 이번 주 기준 날짜 계산 (월요일 09:00)
-def get_current_week_start():
-    KST = pytz.timezone('Asia/Seoul')
-    now = datetime.now(KST) 
-    today_weekday = now.weekday()
-    
-    if today_weekday == 0 and now.hour < 9:
-        days_to_subtract = 7
-    else:
-        days_to_subtract = today_weekday
-        
-    last_monday = now - timedelta(days=days_to_subtract)
-    return last_monday.replace(hour=9, minute=0, second=0, microsecond=0)
+DAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+STATUS_COLUMNS = ["영역", "숙제명", "진척도", "달성률"] + DAYS
+
+def build_class_status(missions, logs, this_week_id):
+    """
+    반 전체의 이번 주 현황 (한 번의 groupby/merge)
+    반환: (status, totals)
+    - status: 학생·숙제별 1행 [Student_ID] + STATUS_COLUMNS (요일 칸은 "✅"/"", 배정 순서)
+    - totals: Student_ID 인덱스 [goal, done, percent] (done = 숙제별 min(체크한 요일 수, 목표) 합)
+    """
+    if missions.empty:
+        return pd.DataFrame(columns=["Student_ID"] + STATUS_COLUMNS), pd.DataFrame(columns=["goal", "done", "percent"])
+
+    hw = pd.DataFrame({
+        "Student_ID": missions["Student_ID"],
+        "영역": missions["Category"].astype(str),
+        "숙제명": missions["Task_Name"] + " (" + missions["Custom_Text"] + ")",
+        "goal": missions["Weekly_Goal"],
+    })
+
+    # 이번 주 (학생, 숙제, 요일) 체크 여부 -> 요일 열 (같은 요일 중복 체크는 1번)
+    marks = pd.DataFrame(False, index=pd.MultiIndex.from_arrays([[], []], names=["Student_ID", "숙제명"]), columns=DAYS)
+    if not logs.empty:
+        week = logs.loc[logs["Week_ID"] == this_week_id, ["Student_ID", "Task_Name", "Day_of_Week"]]
+        week = week.assign(Day_of_Week=week["Day_of_Week"].astype(str))
+        week = week[week["Day_of_Week"].isin(DAYS)].drop_duplicates()
+        if not week.empty:
+            marks = (week.assign(hit=True).set_index(["Student_ID", "Task_Name", "Day_of_Week"])["hit"]
+                         .unstack(fill_value=False).reindex(columns=DAYS, fill_value=False))
+            marks.index.names = ["Student_ID", "숙제명"]
+
+    status = hw.merge(marks.astype(bool), left_on=["Student_ID", "숙제명"], right_index=True, how="left")
+    checked = status[DAYS].fillna(False).astype(bool)
+    done = checked.sum(axis=1)
+    status["진척도"] = done.astype(str) + "/" + status["goal"].astype(str)
+    status["달성률"] = (done / status["goal"] * 100).astype(int).clip(upper=100)
+    status["capped"] = done.clip(upper=status["goal"])
+    status[DAYS] = np.where(checked, "✅", "")
+
+    totals = status.groupby("Student_ID", sort=False).agg(goal=("goal", "sum"), done=("capped", "sum"))
+    totals["percent"] = (totals["done"] / totals["goal"].where(totals["goal"] > 0) * 100).fillna(0).astype(int)
+    return status, totals
 
 def show_admin_page():
     st.title("👑 Administrator Hub")
+    db.prefetch() # 최초 기동 시 필요한 시트를 요청 1번으로
     
     # 탭 구성
     tab1, tab2, tab3 = st.tabs(["📚 숙제 일괄 배정", "🧹 데이터 관리", "📊 전체 이행 현황"])
@@ -56,11 +85,11 @@ def show_admin_page():
             {"선택": False, "영역": "모의고사", "숙제명": "구조화", "비고/범위": "수업분", "주간목표": 1},
         ]
 
-        current_assignments = db.get_homework_list(selected_student_id_t1)
+        current_assignments = db.get_student_rows("Homework_List", selected_student_id_t1)
         
         current_map = {}
-        if current_assignments:
-            for item in current_assignments:
+        if not current_assignments.empty:
+            for item in current_assignments.to_dict("records"):
                 key = (item['Category'], item['Task_Name'])
                 current_map[key] = item
         
@@ -72,8 +101,7 @@ def show_admin_page():
                 saved = current_map[key]
                 row['선택'] = True
                 row['비고/범위'] = saved['Custom_Text']
-                try: row['주간목표'] = int(saved['Weekly_Goal'])
-                except: row['주간목표'] = 1
+                row['주간목표'] = int(saved['Weekly_Goal'])
                 del current_map[key]
             final_data.append(row)
         
@@ -83,7 +111,7 @@ def show_admin_page():
                 "영역": saved['Category'],
                 "숙제명": saved['Task_Name'],
                 "비고/범위": saved['Custom_Text'],
-                "주간목표": int(saved['Weekly_Goal']) if saved['Weekly_Goal'] else 1
+                "주간목표": int(saved['Weekly_Goal'])
             }
             final_data.append(new_row)
 
@@ -107,41 +135,25 @@ def show_admin_page():
         if st.button("수정된 내용으로 저장 (Overwrite) 🚀", type="primary"):
             selected_rows = edited_df[edited_df["선택"] == True]
             
-            with st.spinner(f"💾 {selected_student_raw_t1} 학생의 숙제 데이터를 갱신 중..."):
-                if not db.reset_student_homework(selected_student_id_t1):
-                    st.error("기존 숙제 삭제 중 오류가 발생했습니다. DB 연결을 확인해주세요.")
-                    st.stop()
-            
-            success_count = 0
-            fail_count = 0
-            total = len(selected_rows)
+            assignments = []
+            for _, row in selected_rows.iterrows():
+                try: goal = int(row["주간목표"])
+                except: goal = 1
+                assignments.append((row["영역"], row["숙제명"], row["비고/범위"], goal))
             
-            if total > 0:
-                progress_text = st.empty()
-                bar = st.progress(0)
-                
-                for idx, row in selected_rows.iterrows():
-                    cat = row["영역"]
-                    task = row["숙제명"]
-                    custom = row["비고/범위"]
-                    goal = row["주간목표"]
-                    progress_text.text(f"📤 저장 중... [{task}]")
-                    
-                    if db.add_homework_assignment(selected_student_id_t1, cat, task, custom, int(goal)):
-                        success_count += 1
-                    else:
-                        fail_count += 1
-                    bar.progress((success_count + fail_count) / total)
-                
-                bar.empty()
-                progress_text.empty()
+            # 현재 행과 비교하여 바뀐 부분만 한 번에 전송 (다른 학생 행은 그대로)
+            with st.spinner(f"💾 {selected_student_raw_t1} 학생의 숙제 데이터를 갱신 중..."):
+                result = db.save_student_homework(selected_student_id_t1, assignments)
             
-            if fail_count == 0:
-                st.success(f"✅ {selected_student_raw_t1} 학생의 숙제가 최신 상태로 **저장**되었습니다!")
+            if result is not None:
+                st.success(
+                    f"✅ {selected_student_raw_t1} 학생의 숙제가 최신 상태로 **저장**되었습니다! "
+                    f"(추가 {result['inserted']} · 수정 {result['updated']} · 삭제 {result['deleted']})"
+                )
                 time.sleep(1) 
                 st.rerun()
             else:
-                st.warning(f"⚠️ {success_count}건 성공, {fail_count}건 실패.")
+                st.error("숙제 저장 중 오류가 발생했습니다. DB 연결을 확인해주세요.")
 
     # ------------------------------------------------------------------
     # Tab 2: 데이터 관리
@@ -150,102 +162,66 @@ def show_admin_page():
         st.subheader("시스템 데이터 관리")
         st.warning("⚠️ 주의: 데이터 삭제는 복구할 수 없습니다.")
         if st.button("🧹 오래된 로그 정리 (30일 이상)"):
-            removed_count = db.archive_old_logs()
-            st.success(f"{removed_count}개의 오래된 기록을 Archive로 이동했습니다.")
+            with st.spinner("오래된 기록을 Archive로 이동 중..."):
+                result_msg = db.archive_old_logs()
+            st.info(result_msg)
+        st.caption("💡 서버에서 `python jobs.py archive` 로 정기 실행할 수 있습니다.")
+
+        st.divider()
+        st.markdown("##### 📡 구글 시트 API 사용량 (최근 1분)")
+        usage = db.get_quota_status()
+        q_cols = st.columns(2)
+        for col, (kind, label) in zip(q_cols, [("read", "읽기"), ("write", "쓰기")]):
+            u = usage[kind]
+            with col:
+                st.metric(f"{label} 요청", f"{u['used_last_min']} / {u['limit_per_min']}")
+                st.progress(min(u["usage_ratio"], 1.0))
+                st.caption(f"대기 {u['throttled_calls']}회 ({u['throttled_sec']}초) · 재시도 {u['retries']}회")
+
+        st.divider()
+        st.markdown("##### 🧠 메모리 사용량 (이 서버 프로세스)")
+        mem = db.get_memory_report()
+        mb = lambda n: f"{n / 1024 / 1024:.1f} MB"
+        m_cols = st.columns(2)
+        with m_cols[0]:
+            st.metric("공용 스냅샷", f"{mb(mem['total_bytes'])} / {mb(mem['budget_bytes'])}")
+            st.progress(min(mem["total_bytes"] / mem["budget_bytes"], 1.0) if mem["budget_bytes"] else 0.0)
+        with m_cols[1]:
+            st.metric("세션 오버레이", f"{len(mem['sessions'])}개 세션 · {mem['session_total_bytes'] / 1024:.1f} KB")
+        if mem["sheets"]:
+            st.dataframe(pd.DataFrame({"시트": list(mem["sheets"]), "MB": [round(n / 1024 / 1024, 2) for n in mem["sheets"].values()]}),
+                         hide_index=True, use_container_width=True)
 
     # ------------------------------------------------------------------
     # Tab 3: 전체 학생 이행 현황 (All-in-One View)
     # ------------------------------------------------------------------
     with tab3:
         st.subheader("📊 전체 학생 주간 이행 현황 (Dashboard)")
-        st.caption(f"기준 시각: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} (실시간)")
+        st.caption(f"기준 시각: {weeks.now().strftime('%Y-%m-%d %H:%M:%S')} (실시간, KST)")
 
         if st.button("전체 현황 새로고침 🔄", type="primary", use_container_width=True):
             with st.spinner("모든 학생의 데이터를 분석 중입니다..."):
                 
-                # 1. [Optimization] DB 통신 최소화: 모든 데이터를 한 번에 가져옴
+                # 1. [Optimization] 반 전체를 한 번에 계산 (학생마다 시트를 다시 거르거나 행을 반복하지 않음)
                 all_users = db.get_all_users() # ["id (name)", ...]
-                raw_hw = db.get_data("Homework_List")
-                raw_log = db.get_data("Homework_Log")
-                
-                # Pandas DataFrame으로 변환 (필터링 속도 향상)
-                df_hw_all = pd.DataFrame(raw_hw) if raw_hw else pd.DataFrame()
-                df_log_all = pd.DataFrame(raw_log) if raw_log else pd.DataFrame()
-                
-                week_start = get_current_week_start()
-                week_start_naive = week_start.replace(tzinfo=None)
-                days = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+                this_week_id = weeks.current_week_id() # 이번 주 번호 (KST 월요일 09:00 기준)
+                status, totals = build_class_status(db.get_data("Homework_List"), db.get_data("Homework_Log"), this_week_id)
+                by_student = {sid: rows for sid, rows in status.groupby("Student_ID", sort=False)} if not status.empty else {}
 
-                # 2. 학생별 반복 처리
+                # 2. 학생별로 그리기만 함
                 for student_str in all_users:
                     student_id = student_str.split(' (')[0]
                     student_name = student_str.split(' (')[1].replace(')', '')
                     
-                    # A. 내 숙제 필터링
-                    if df_hw_all.empty:
-                        my_hw_rows = pd.DataFrame()
-                    else:
-                        my_hw_rows = df_hw_all[df_hw_all["Student_ID"].astype(str) == str(student_id)]
-                    
-                    if my_hw_rows.empty:
+                    my_status = by_student.get(str(student_id))
+                    if my_status is None:
                         # 숙제가 없는 학생은 스킵하거나 별도 표시
                         with st.expander(f"⚪ {student_name} ({student_id}) - 배정된 숙제 없음"):
                             st.info("아직 숙제가 배정되지 않았습니다.")
                         continue
 
-                    # B. 내 로그 필터링 (이번 주 기록만)
-                    my_done_set = set()
-                    if not df_log_all.empty:
-                        my_logs = df_log_all[df_log_all["Student_ID"].astype(str) == str(student_id)]
-                        for _, row in my_logs.iterrows():
-                            try:
-                                completed_at = datetime.strptime(str(row.get("Completed_At")), "%Y-%m-%d %H:%M:%S")
-                                if completed_at >= week_start_naive:
-                                    my_done_set.add((row.get("Task_Name"), row.get("Day_of_Week")))
-                            except: continue
-                    
-                    # C. 통계 계산
-                    total_goal = 0
-                    total_done = 0
-                    status_data = []
-                    
-                    for _, hw in my_hw_rows.iterrows():
-                        task = hw['Task_Name']
-                        custom = hw['Custom_Text']
-                        full_name = f"{task} ({custom})"
-                        
-                        try: goal = int(hw['Weekly_Goal'])
-                        except: goal = 1
-                        
-                        # 개별 숙제 수행 카운트
-                        done_count = 0
-                        day_marks = {}
-                        for d in days:
-                            if (full_name, d) in my_done_set:
-                                day_marks[d] = "✅"
-                                done_count += 1
-                            else:
-                                day_marks[d] = ""
-                        
-                        total_goal += goal
-                        total_done += min(done_count, goal) # 100% 초과 방지
-                        
-                        progress_pct = min(int((done_count / goal) * 100), 100)
-                        
-                        row_data = {
-                            "영역": hw['Category'],
-                            "숙제명": full_name,
-                            "진척도": f"{done_count}/{goal}",
-                            "달성률": progress_pct # 숫자만 넣어서 bar chart 활용
-                        }
-                        row_data.update(day_marks)
-                        status_data.append(row_data)
-
-                    # D. UI 렌더링 (Expandable Card)
-                    # 전체 달성률 계산
-                    final_percent = 0
-                    if total_goal > 0:
-                        final_percent = int((total_done / total_goal) * 100)
+                    # UI 렌더링 (Expandable Card)
+                    final_percent = int(totals.at[str(student_id), "percent"])
                     
                     # 상태에 따른 이모지/색상
                     if final_percent >= 100: icon = "🏆"
@@ -260,11 +236,8 @@ def show_admin_page():
                         st.progress(min(final_percent / 100, 1.0))
                         
                         # 상세 표
-                        df_status = pd.DataFrame(status_data)
+                        df_status = my_status[STATUS_COLUMNS].reset_index(drop=True)
                         if not df_status.empty:
-                            cols_order = ["영역", "숙제명", "진척도", "달성률"] + days
-                            df_status = df_status[cols_order]
-                            
                             st.dataframe(
                                 df_status,
                                 hide_index=True,
@@ -20,20 +20,15 @@ def login():
     if not st.session_state["logged_in"] and url_id:
         with st.spinner("계정 정보를 확인 중입니다..."):
             try:
-                users_data = db.get_data("Users")
-                if users_data:
-                    df = pd.DataFrame(users_data)
-                    df.columns = df.columns.str.strip()
-                    
-                    if "Student_ID" in df.columns:
-                        user = df[df["Student_ID"].astype(str) == str(url_id)]
-                        
-                        if not user.empty:
-                            st.session_state["logged_in"] = True
-                            st.session_state["user_name"] = user.iloc[0]["Name"]
-                            st.session_state["user_id"] = user.iloc[0]["Student_ID"]
-                            st.session_state["role"] = user.iloc[0].get("Role", "student")
-                            return True
+                # 학생별 인덱스에서 바로 조회 (전체 스캔 X)
+                user = db.get_student_rows("Users", url_id)
+                
+                if not user.empty:
+                    st.session_state["logged_in"] = True
+                    st.session_state["user_name"] = user.iloc[0]["Name"]
+                    st.session_state["user_id"] = user.iloc[0]["Student_ID"]
+                    st.session_state["role"] = user.iloc[0].get("Role", "student")
+                    return True
             except Exception as e:
                 print(f"자동 로그인 실패: {e}")
 
@@ -62,18 +57,16 @@ def login():
                 return False
 
             with st.spinner("DB 접속 중..."):
-                users_data = db.get_data("Users")
+                users_by_id = db.get_partitions("Users")
             
-            if not users_data:
+            if not users_by_id:
                 st.error("데이터베이스 연결에 실패했습니다. 잠시 후 다시 시도하세요.")
                 return False
 
-            df = pd.DataFrame(users_data)
-            df.columns = df.columns.str.strip()
-
             try:
-                user = df[(df["Student_ID"].astype(str) == str(user_id)) & 
-                          (df["Password"].astype(str) == str(password))]
+                user = users_by_id.get(str(user_id).strip(), pd.DataFrame())
+                if not user.empty:
+                    user = user[user["Password"].astype(str) == str(password)]
 
                 if not user.empty:
                     st.session_state["logged_in"] = True
@@ -0,0 +1,97 @@
+# modules/bench.py
+# 대시보드 통계 집계의 비교 기준과 측정용 데이터 (jobs.py bench / tests/test_dashboard_stats.py 공용)
+# - original_dashboard_stats: 열 단위 집계 이전의 show_dashboard [Logic] 부분을 그대로 옮긴 것
+#   (시트 레코드 그대로, iterrows + strptime + 이번 주 월요일 09:00 비교)
+# - bench_records: 학생 1명 분량의 시트 레코드 생성
+from datetime import datetime, timedelta
+import pandas as pd
+from modules import storage, weeks
+
+def original_dashboard_stats(user_id, hw_list, log_data, exam_data, history_data, week_start):
+    """show_dashboard 의 통계 집계 (History Sum + Current) - 원래 코드 그대로, 화면 출력만 뺌"""
+    df_hw = pd.DataFrame(hw_list)
+    df_log = pd.DataFrame(log_data) if log_data else pd.DataFrame()
+    df_exam = pd.DataFrame(exam_data) if exam_data else pd.DataFrame()
+    df_history = pd.DataFrame(history_data) if history_data else pd.DataFrame()
+
+    my_missions = df_hw[df_hw["Student_ID"].astype(str) == str(user_id)]
+    stats = {}
+
+    # [Step 1] 과거 기록(History) 합산
+    if not df_history.empty:
+        for _, h_row in df_history.iterrows():
+            cat = h_row.get("Category")
+            try:
+                h_goal = int(h_row.get("Goal_Snapshot"))
+                h_done = int(h_row.get("Done_Snapshot"))
+            except:
+                h_goal, h_done = 0, 0
+            if cat not in stats:
+                stats[cat] = {'weekly_goal':0, 'weekly_done':0, 'total_goal':0, 'total_done':0}
+            stats[cat]['total_goal'] += h_goal
+            stats[cat]['total_done'] += h_done
+
+    # [Step 2] 이번 주(Current) 실시간 데이터 계산 및 합산
+    for _, row in my_missions.iterrows():
+        category = row["Category"]
+        task_name = row["Task_Name"]
+        custom_text = row["Custom_Text"]
+        try:
+            weekly_goal = int(row.get("Weekly_Goal")) if row.get("Weekly_Goal") else 1
+        except: weekly_goal = 1
+        if category not in stats:
+            stats[category] = {'weekly_goal':0, 'weekly_done':0, 'total_goal':0, 'total_done':0}
+        stats[category]['weekly_goal'] += weekly_goal
+        stats[category]['total_goal'] += weekly_goal
+
+        current_done_count = 0
+        is_exam = ("시험" in category) or ("Test" in category) or ("시험" in task_name)
+        if is_exam and not df_exam.empty:
+            my_exams = df_exam[(df_exam["Student_ID"].astype(str) == str(user_id)) &
+                               (df_exam["Range"].astype(str) == str(custom_text))]
+            for _, e_row in my_exams.iterrows():
+                try:
+                    e_date = datetime.strptime(str(e_row["Date"]), "%Y-%m-%d")
+                    if e_date.date() >= week_start.date():
+                        current_done_count += 1
+                except: continue
+        elif not is_exam and not df_log.empty:
+            full_name = f"{task_name} ({custom_text})"
+            my_logs = df_log[(df_log["Student_ID"].astype(str) == str(user_id)) &
+                             (df_log["Task_Name"] == full_name)]
+            for _, l_row in my_logs.iterrows():
+                try:
+                    l_date = datetime.strptime(str(l_row["Completed_At"]), "%Y-%m-%d %H:%M:%S")
+                    if l_date >= week_start:
+                        current_done_count += 1
+                except: continue
+
+        stats[category]['weekly_done'] += current_done_count
+        stats[category]['total_done'] += current_done_count
+    return stats
+
+def bench_records(rng, n_weeks, this_week_id, student_id="1"):
+    """
+    학생 1명, n_weeks 주 분량의 시트 레코드 (마감 기록 + 전체 기간 체크/시험 기록)
+    -> {"Homework_List": [...], "Homework_Log": [...], "Exam_Results": [...], "Weekly_History": [...]} (시트에 적히는 값 그대로)
+    """
+    sid = str(student_id)
+    now = weeks.now().replace(tzinfo=None)
+    missions, logs, exams, history = [], [], [], []
+    for cat, task, custom, goal in storage.DEMO_TASKS:
+        if rng.random() < 0.8: missions.append({"Student_ID": sid, "Category": cat, "Task_Name": task, "Custom_Text": custom, "Weekly_Goal": goal})
+    for wid in range(this_week_id - n_weeks, this_week_id + 1):
+        start = weeks.week_start(wid)
+        span = min(7 * 86400, int((now - start).total_seconds())) # 이번 주는 지금까지만 (미래 기록 X)
+        for m in missions:
+            if wid < this_week_id:
+                history.append({"Student_ID": sid, "Week_Start_Date": start.strftime("%Y-%m-%d"), "Category": m["Category"],
+                                "Goal_Snapshot": m["Weekly_Goal"], "Done_Snapshot": rng.randint(0, m["Weekly_Goal"] + 1)})
+            for _ in range(rng.randint(0, m["Weekly_Goal"] + 1) if span > 0 else 0):
+                ts = start + timedelta(seconds=rng.randint(0, span - 1))
+                if "시험" in m["Task_Name"]:
+                    exams.append({"Student_ID": sid, "Range": m["Custom_Text"], "Score": 90, "Date": ts.strftime("%Y-%m-%d")})
+                else:
+                    logs.append({"Student_ID": sid, "Task_Name": f"{m['Task_Name']} ({m['Custom_Text']})",
+                                 "Completed_At": ts.strftime("%Y-%m-%d %H:%M:%S"), "Day_of_Week": storage.DAYS[ts.weekday()], "Log_ID": ""})
+    return {"Homework_List": missions, "Homework_Log": logs, "Exam_Results": exams, "Weekly_History": history}
@@ -1,20 +1,10 @@
 # modules/dashboard.py
 import streamlit as st
 import pandas as pd
-import plotly.graph_objects as go
-from datetime import datetime, timedelta
-from modules import db
+from modules import db, render, weeks
 
-# [보조 함수] 이번 주 월요일 09:00 계산
-def get_week_start():
-    now = datetime.now()
-    today_weekday = now.weekday() # 0:월 ~ 6:일
-    if today_weekday == 0 and now.hour < 9:
-        days_to_subtract = 7
-    else:
-        days_to_subtract = today_weekday
-    last_monday = now - timedelta(days=days_to_subtract)
-    return last_monday.replace(hour=9, minute=0, second=0, microsecond=0)
+# 달성률 추이 기간 선택 -> 최근 주 수 (None = 전체)
+TREND_SPANS = {"최근 3개월": 13, "최근 1년": 52, "전체": None}
 
 def show_dashboard():
     # 1. 사용자 체크
@@ -26,23 +16,15 @@ def show_dashboard():
     user_name = st.session_state["user_name"]
     
     # 2. 데이터 로딩
-    hw_list = db.get_data("Homework_List")
-    log_data = db.get_data("Homework_Log")
-    exam_data = db.get_data("Exam_Results")
-    users_data = db.get_data("Users")
-    history_data = db.get_weekly_history(user_id) # 과거 박제된 데이터
-    
-    if not hw_list:
+    db.prefetch() # 최초 기동 시 필요한 시트를 요청 1번으로 (시트마다 따로 읽지 않음)
+    # 학생별 인덱스에서 내 행만 조회 (전체 시트 스캔 X)
+    if not db.get_partitions("Homework_List"):
         st.info("등록된 숙제가 없습니다.")
         return
 
-    df_hw = pd.DataFrame(hw_list)
-    df_log = pd.DataFrame(log_data) if log_data else pd.DataFrame()
-    df_exam = pd.DataFrame(exam_data) if exam_data else pd.DataFrame()
-    df_history = pd.DataFrame(history_data) if history_data else pd.DataFrame()
-    df_users = pd.DataFrame(users_data)
+    my_missions = db.get_student_rows("Homework_List", user_id)
+    user_row = db.get_student_rows("Users", user_id)
 
-    my_missions = df_hw[df_hw["Student_ID"].astype(str) == str(user_id)]
     if my_missions.empty:
         st.warning("할당된 숙제가 없습니다.")
         return
@@ -50,9 +32,9 @@ def show_dashboard():
     # 가입일(Start_Date) 확인 - 단순 표시용
     start_date_str = "-"
     try:
-        user_row = df_users[df_users["Student_ID"].astype(str) == str(user_id)]
         if not user_row.empty:
-            start_date_str = user_row.iloc[0]["Start_Date"]
+            start_dt = user_row.iloc[0]["Start_Date"]
+            if pd.notna(start_dt): start_date_str = start_dt.strftime("%Y-%m-%d")
     except: pass
 
     st.markdown(f"## 📊 {user_name}의 숙제 현황")
@@ -60,74 +42,9 @@ def show_dashboard():
     st.divider()
 
     # ---------------------------------------------------------
-    # [Logic] 통계 집계 (History Sum + Current)
+    # [Logic] 통계 (History Sum + Current) - 미리 집계된 (학생, 주, 영역) 표에서 읽기만 함
     # ---------------------------------------------------------
-    stats = {}
-    week_start = get_week_start()
-
-    # [Step 1] 과거 기록(History) 합산 (순수하게 DB에 있는 것만 더함)
-    if not df_history.empty:
-        for _, h_row in df_history.iterrows():
-            cat = h_row.get("Category")
-            try:
-                h_goal = int(h_row.get("Goal_Snapshot"))
-                h_done = int(h_row.get("Done_Snapshot"))
-            except:
-                h_goal, h_done = 0, 0
-                
-            if cat not in stats:
-                stats[cat] = {'weekly_goal':0, 'weekly_done':0, 'total_goal':0, 'total_done':0}
-            
-            stats[cat]['total_goal'] += h_goal
-            stats[cat]['total_done'] += h_done
-
-    # [Step 2] 이번 주(Current) 실시간 데이터 계산 및 합산
-    for _, row in my_missions.iterrows():
-        category = row["Category"]
-        task_name = row["Task_Name"]
-        custom_text = row["Custom_Text"]
-        
-        try:
-            weekly_goal = int(row.get("Weekly_Goal")) if row.get("Weekly_Goal") else 1
-        except: weekly_goal = 1
-            
-        if category not in stats:
-            stats[category] = {'weekly_goal':0, 'weekly_done':0, 'total_goal':0, 'total_done':0}
-            
-        # 주간 목표 설정
-        stats[category]['weekly_goal'] += weekly_goal
-        # [핵심 수정] 누적 목표에 '이번 주 목표'를 더함 (경과 주수 곱하기 삭제!)
-        stats[category]['total_goal'] += weekly_goal
-        
-        # Done 계산 (이번 주)
-        current_done_count = 0
-        
-        is_exam = ("시험" in category) or ("Test" in category) or ("시험" in task_name)
-        
-        if is_exam and not df_exam.empty:
-            my_exams = df_exam[(df_exam["Student_ID"].astype(str) == str(user_id)) & 
-                               (df_exam["Range"].astype(str) == str(custom_text))]
-            for _, e_row in my_exams.iterrows():
-                try:
-                    e_date = datetime.strptime(str(e_row["Date"]), "%Y-%m-%d")
-                    # 이번 주 데이터만 카운트 (과거는 History에 있으므로)
-                    if e_date.date() >= week_start.date():
-                        current_done_count += 1
-                except: continue
-                
-        elif not is_exam and not df_log.empty:
-            full_name = f"{task_name} ({custom_text})"
-            my_logs = df_log[(df_log["Student_ID"].astype(str) == str(user_id)) & 
-                             (df_log["Task_Name"] == full_name)]
-            for _, l_row in my_logs.iterrows():
-                try:
-                    l_date = datetime.strptime(str(l_row["Completed_At"]), "%Y-%m-%d %H:%M:%S")
-                    if l_date >= week_start:
-                        current_done_count += 1
-                except: continue
-        
-        stats[category]['weekly_done'] += current_done_count
-        stats[category]['total_done'] += current_done_count
+    stats = db.get_student_stats(user_id)
 
     # ---------------------------------------------------------
     # [Visual] 시각화
@@ -137,7 +54,6 @@ def show_dashboard():
     # [Part 1] Weekly Radar (금주의 밸런스)
     st.subheader("🕸️ 주간 숙제 현황")
     if categories:
-        r_goals = [1.0] * len(categories)
         r_dones = []
         for c in categories:
             g = stats[c]['weekly_goal']
@@ -145,29 +61,17 @@ def show_dashboard():
             ratio = d/g if g>0 else 0
             r_dones.append(min(ratio, 1.1))
 
-        cats_closed = categories + [categories[0]]
-        r_goals_closed = r_goals + [r_goals[0]]
-        r_dones_closed = r_dones + [r_dones[0]]
-
-        fig = go.Figure()
-        fig.add_trace(go.Scatterpolar(r=r_goals_closed, theta=cats_closed, fill='toself',
-            name='Goal', line=dict(color='#CFD8DC', dash='dot'), hoverinfo='skip'))
-        fig.add_trace(go.Scatterpolar(r=r_dones_closed, theta=cats_closed, fill='toself',
-            name='Progress', line=dict(color='#3498DB'), fillcolor='rgba(52, 152, 219, 0.6)'))
-        
-        fig.update_layout(polar=dict(radialaxis=dict(visible=False, range=[0, 1.1])), 
-                          showlegend=False, height=300, margin=dict(l=30, r=30, t=20, b=20))
+        # (영역, 비율) 이 지난번과 같으면 만들어 둔 Figure 를 그대로 사용
+        fig = render.radar_figure(tuple(categories), tuple(r_dones))
         st.plotly_chart(fig, use_container_width=True)
         
-        # 주간 요약 텍스트
-        cols = st.columns(len(categories))
-        for idx, cat in enumerate(categories):
+        # 주간 요약 텍스트 (카테고리 전체를 markdown 1번으로)
+        summary = []
+        for cat in categories:
             g = stats[cat]['weekly_goal']
             d = stats[cat]['weekly_done']
-            p = int((d/g)*100) if g>0 else 0
-            with cols[idx]:
-                st.markdown(f"<div style='text-align:center; font-size:0.8rem;'>{cat}</div>", unsafe_allow_html=True)
-                st.markdown(f"<div style='text-align:center; font-weight:bold;'>{p}%</div>", unsafe_allow_html=True)
+            summary.append((cat, int((d/g)*100) if g>0 else 0))
+        st.markdown(render.weekly_summary(summary), unsafe_allow_html=True)
     
     st.divider()
     
@@ -176,30 +80,25 @@ def show_dashboard():
     st.caption("누적 학습량 = (지난주까지의 확정 기록) + (이번 주 실시간 기록)")
     st.write("")
     
-    for cat in categories:
-        t_goal = stats[cat]['total_goal']
-        t_done = stats[cat]['total_done']
-        t_rate = t_done / t_goal if t_goal > 0 else 0
-        
-        # 목표 달성 여부에 따른 색상
-        status_color = "#3498DB" # 기본 파랑
-        if t_rate >= 1.0: status_color = "#2ECC71" # 달성 시 초록
-        
-        st.markdown(f"""
-        <div style="margin-bottom:5px;">
-            <span style="font-weight:bold;">{cat}</span>
-            <span style="float:right; font-size:0.9rem; color:#546E7A;">
-                <b>{t_done}</b> / {t_goal} <span style="color:{status_color}">({int(t_rate*100)}%)</span>
-            </span>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        bar_fill = "linear-gradient(90deg, #3498DB, #8E44AD)"
-        if t_rate >= 1.0: bar_fill = "linear-gradient(90deg, #11998e, #38ef7d)"
-        
-        st.markdown(f"""
-        <div style="background:#ECEFF1; border-radius:10px; height:12px; width:100%;">
-            <div style="background:{bar_fill}; width:{min(t_rate*100, 100)}%; height:100%; border-radius:10px;"></div>
-        </div>
-        <div style="margin-bottom:15px;"></div>
-        """, unsafe_allow_html=True)
\ No newline at end of file
+    # 카테고리별 누적 막대 (템플릿 + 메모이즈된 막대, markdown 1번)
+    st.markdown(render.total_progress([(cat, stats[cat]['total_done'], stats[cat]['total_goal']) for cat in categories]),
+                unsafe_allow_html=True)
+
+    st.divider()
+
+    # [Part 3] Trend (영역별 달성률 추이) - 고른 기간만 조회, 길면 월 단위로 묶어서 전송
+    st.subheader("📈 달성률 추이")
+    span = st.radio("기간", list(TREND_SPANS), horizontal=True, key="trend_span", label_visibility="collapsed")
+    n_weeks = TREND_SPANS[span]
+    since_week = weeks.current_week_id() - n_weeks + 1 if n_weeks else None
+    unit, trend = db.get_student_trend(user_id, since_week)
+    if trend.empty:
+        st.info("아직 표시할 기록이 없습니다.")
+        return
+
+    series = tuple(
+        (cat, tuple(group["Period"].dt.strftime("%Y-%m-%d")), tuple(group["rate"].tolist()))
+        for cat, group in trend.groupby("Category", sort=False)
+    )
+    st.plotly_chart(render.trend_figure(unit, series), use_container_width=True)
+    st.caption("월별 합계 기준 (기간이 길어 월 단위로 표시)" if unit == "month" else "주별 기준 (이번 주는 진행 중)")
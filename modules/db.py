@@ -1,11 +1,17 @@
 # modules/db.py
 import streamlit as st
 import gspread
-from google.oauth2.service_account import Credentials
 import pandas as pd
 from datetime import datetime
 import pytz 
 import re 
+import os
+import threading
+import time
+import uuid
+from collections import Counter
+from types import MappingProxyType
+from modules import mirror, storage, quota, snapshots, weeks
 
 # ---------------------------------------------------------
 # 1. 키 자동 보정 함수 (기능 유지)
@@ -27,16 +33,21 @@ def fix_private_key(key):
         return key
 
 # ---------------------------------------------------------
-# 2. 구글 시트 연결 및 인증 (리소스 캐싱 유지)
+# 2. 저장소 연결 및 인증 (리소스 캐싱 유지)
 # ---------------------------------------------------------
-SCOPES = [
-    "https://www.googleapis.com/auth/spreadsheets",
-    "https://www.googleapis.com/auth/drive",
-]
+# sheets: 구글 시트 (운영) / local: 메모리 가짜 시트 (오프라인 측정·부하 테스트, modules/storage.py)
+STORAGE_BACKEND = os.environ.get("ORACLE_BACKEND", "sheets").strip().lower()
+if STORAGE_BACKEND == "local":
+    mirror.use_temp_file() # 로컬 백엔드는 프로세스마다 새 데이터이므로 미러도 새로
 
+# 연결은 프로세스 공용 할당량 클라이언트(modules/quota.py)로 감싸서 반환:
+# 분당 읽기/쓰기 한도를 넘지 않도록 대기하고, 429 등은 백오프 후 재시도
 @st.cache_resource
 def get_connection():
     try:
+        if STORAGE_BACKEND == "local":
+            return quota.wrap(storage.open_local())
+
         if "gcp_service_account" not in st.secrets:
             return None
         creds_dict = dict(st.secrets["gcp_service_account"])
@@ -45,10 +56,7 @@ def get_connection():
             raw_key = creds_dict["private_key"]
             creds_dict["private_key"] = fix_private_key(raw_key)
         
-        creds = Credentials.from_service_account_info(creds_dict, scopes=SCOPES)
-        client = gspread.authorize(creds)
-        doc = client.open("Oracle_DB") 
-        return doc
+        return quota.wrap(storage.open_sheets(creds_dict, "Oracle_DB"))
     except Exception as e:
         print(f"DB Connection Error: {e}")
         return None
@@ -58,6 +66,9 @@ doc = get_connection()
 # ---------------------------------------------------------
 # 3. 워크시트 정의 (기능 유지)
 # ---------------------------------------------------------
+# 열기 도중 실패해도 아래 모듈 수준 코드(TAIL_SYNCED_SHEETS 등)가 이름을 찾을 수 있도록 기본값
+homework_log_sheet = None
+log_archive_sheet = None
 if doc:
     try:
         user_sheet = doc.worksheet("Users")
@@ -80,93 +91,528 @@ else:
     log_archive_sheet = None
 
 # ---------------------------------------------------------
-# 4. 데이터 조회/조작 함수들 (★수정됨: 캐싱 적용★)
+# 4. 로컬 미러 동기화 (★시트 → SQLite, 백그라운드★)
 # ---------------------------------------------------------
+# 앱이 읽는 시트들. 페이지 렌더링은 이 시트들을 미러에서만 읽음.
+MIRRORED_SHEETS = ["Users", "Homework_List", "Homework_Log", "Exam_Results", "Weekly_History"]
+MIRROR_REFRESH_SEC = 60   # 시트별 전체 재동기화 주기
+MIRROR_POLL_SEC = 5       # 동기화 스레드 점검 주기
 
-# [핵심 수정] ttl=600(10분) 캐싱 적용 -> 403 에러 방지 및 속도 향상
-@st.cache_data(ttl=600)
-def get_data(sheet_name):
-    if doc is None: return []
+# 추가만 되는 시트: 전체를 다시 읽지 않고 미러에 없는 아래쪽 행만 읽음 (꼬리 동기화)
+# (Log_Archive 는 선택 시트: 없으면 꼬리 동기화도 하지 않음)
+TAIL_SYNCED_SHEETS = ["Log_Archive"] if log_archive_sheet is not None else []
+TAIL_REFRESH_SEC = 600
+TAIL_CHUNK_ROWS = 1000
+
+# 시트 헤더 (쓰기 직후 미러에 같은 레코드를 넣기 위해 사용)
+HEADERS = {
+    "Homework_List": ["Student_ID", "Category", "Task_Name", "Custom_Text", "Weekly_Goal"],
+    # Log_ID: 행마다 고유한 키 (시트 1행 E열에 'Log_ID' 헤더 필요)
+    "Homework_Log": ["Student_ID", "Task_Name", "Completed_At", "Day_of_Week", "Log_ID"],
+    "Log_Archive": ["Student_ID", "Task_Name", "Completed_At", "Day_of_Week", "Log_ID"],
+    "Weekly_History": ["Student_ID", "Week_Start_Date", "Category", "Goal_Snapshot", "Done_Snapshot"],
+}
+
+def _to_records(sheet_name, rows, header=None):
+    # get_all_records 와 같은 형태 (숫자 문자열 -> 숫자)
+    header = header or HEADERS[sheet_name]
+    return [dict(zip(header, gspread.utils.numericise_all([str(v) for v in row]))) for row in rows]
+
+def sync_sheet(sheet_name):
+    """시트 1개를 통째로 읽어 미러를 교체 (네트워크 1회)
+    읽는 동안 이 프로세스의 쓰기가 미러에 먼저 반영됐으면, 오래된 내용으로 덮지 않고 1번 다시 읽음"""
+    if doc is None: return False
+    for _ in range(2):
+        version = mirror.version(sheet_name) # 읽기 전에 기록
+        records = doc.worksheet(sheet_name).get_all_records()
+        if mirror.replace_sheet(sheet_name, records, version): return True
+    return False
+
+def sync_sheets(sheet_names):
+    """여러 시트를 values_batch_get 1번(네트워크 1회)으로 통째로 읽어 각 미러를 교체"""
+    if doc is None: return False
+    sheet_names = list(sheet_names)
+    if not sheet_names: return True
+    # 읽는 사이 쓰기가 반영된 시트는 교체하지 않음 (다음 주기에 다시 동기화)
+    versions = [mirror.version(name) for name in sheet_names]
+    response = doc.values_batch_get([f"'{name}'" for name in sheet_names])
+    for name, version, value_range in zip(sheet_names, versions, response.get("valueRanges", [])):
+        values = value_range.get("values", [])
+        if not values:
+            mirror.replace_sheet(name, [], version)
+            continue
+        # get_all_records 와 같은 결과: 1행 = 헤더, 짧은 행은 빈칸으로 채움
+        header = [str(h) for h in values[0]]
+        rows = [(list(r) + [""] * (len(header) - len(r)))[:len(header)] for r in values[1:]]
+        mirror.replace_sheet(name, _to_records(name, rows, header), version)
+    return True
+
+def sync_tail(sheet_name, chunk_rows=TAIL_CHUNK_ROWS):
+    """추가만 되는 시트: 미러의 마지막 행 다음부터 끝까지 구간 읽기 (처음엔 전체를 나눠서 1번)"""
+    if doc is None: return False
+    ws = doc.worksheet(sheet_name)
+    width = len(HEADERS[sheet_name])
+    last_col = chr(ord("A") + width - 1)
+    while True:
+        start = mirror.row_count(sheet_name) + 2
+        rows = ws.get(f"A{start}:{last_col}{start + chunk_rows - 1}")
+        rows = [list(r) + [""] * (width - len(r)) for r in rows or []]
+        # 행 번호를 지정해서 반영: 다른 프로세스(jobs.py)와 겹쳐도 중복 없음
+        mirror.put_rows(sheet_name, start, _to_records(sheet_name, rows))
+        if len(rows) < chunk_rows: break
+    return True
+
+def _sync_loop():
+    while True:
+        # 주기가 된 시트들은 묶어서 요청 1번으로
+        due = [name for name in MIRRORED_SHEETS if time.time() - mirror.synced_at(name) >= MIRROR_REFRESH_SEC]
+        if due:
+            try:
+                sync_sheets(due)
+            except Exception as e:
+                print(f"Mirror Sync Error ({', '.join(due)}): {e}")
+        for name in TAIL_SYNCED_SHEETS:
+            if time.time() - mirror.synced_at(name) >= TAIL_REFRESH_SEC:
+                try:
+                    sync_tail(name)
+                except Exception as e:
+                    print(f"Mirror Tail Sync Error ({name}): {e}")
+        time.sleep(MIRROR_POLL_SEC)
+
+@st.cache_resource
+def start_mirror_sync():
+    """프로세스당 1개의 동기화 스레드 실행"""
+    worker = threading.Thread(target=_sync_loop, name="oracle-mirror-sync", daemon=True)
+    worker.start()
+    return worker
+
+# 기록 시트의 Log_ID 헤더 (1행 E열): 없으면 get_all_records 결과에 Log_ID 가 빠짐
+LOG_ID_SHEETS = {"Homework_Log": homework_log_sheet, "Log_Archive": log_archive_sheet}
+
+@st.cache_resource
+def ensure_log_id_headers():
+    """1행 E열이 비어 있으면 'Log_ID' 를 채움 (기존 행의 Log_ID 는 빈칸으로 남음). 다른 값이면 경고만."""
+    col = HEADERS["Homework_Log"].index("Log_ID")
+    for name, ws in LOG_ID_SHEETS.items():
+        if ws is None: continue
+        try:
+            header = ws.row_values(1)
+            current = str(header[col]).strip() if len(header) > col else ""
+            if current == "Log_ID": continue
+            if current:
+                print(f"⚠️ {name} 1행 E열이 'Log_ID' 가 아닙니다: {current}")
+                continue
+            doc.batch_update({"requests": [{"updateCells": {
+                "range": {"sheetId": ws.id, "startRowIndex": 0, "endRowIndex": 1,
+                          "startColumnIndex": col, "endColumnIndex": col + 1},
+                "rows": [{"values": [{"userEnteredValue": {"stringValue": "Log_ID"}}]}],
+                "fields": "userEnteredValue",
+            }}]})
+            print(f"{name} 1행 E열에 'Log_ID' 헤더 추가")
+        except Exception as e:
+            print(f"Log_ID 헤더 확인 실패 ({name}): {e}")
+    return True
+
+if doc:
+    ensure_log_id_headers()
+    start_mirror_sync()
+
+# ---------------------------------------------------------
+# 5. 데이터 조회/조작 함수들 (★수정됨: 로컬 미러 조회★)
+# ---------------------------------------------------------
+
+# [캐시 무효화] 세대 카운터를 스냅샷 키에 포함
+# - 쓰기/동기화로 내용이 바뀐 시트(또는 학생)의 카운터만 올라감
+# - 따라서 전역 캐시 비우기 없이도, 바뀐 범위만 다시 만들어짐
+# - 스냅샷은 프로세스 공용 읽기 전용 (세션마다 복사하지 않음, modules/snapshots.py)
+
+def prefetch(sheet_names=MIRRORED_SHEETS):
+    """
+    페이지가 쓸 시트들 중 미러가 한 번도 채워지지 않은 것(최초 기동)만 요청 1번으로 함께 읽음.
+    페이지 맨 앞에서 호출하면, 이후 조회마다 시트를 1개씩 따로 읽지 않음.
+    """
+    if doc is None: return False
     try:
-        return doc.worksheet(sheet_name).get_all_records()
-    except: return []
+        return sync_sheets([name for name in sheet_names if mirror.synced_at(name) == 0])
+    except Exception as e:
+        print(f"Mirror Prefetch Error: {e}")
+        return False
 
-def get_all_users():
-    if user_sheet is None: return []
+def _ensure_mirror(sheet_name):
+    # 미러가 한 번도 채워지지 않은 경우(최초 기동)에만 동기 읽기
+    if mirror.synced_at(sheet_name) == 0:
+        sync_sheet(sheet_name)
+
+# [타입 정규화] 시트별 컬럼 타입 (캐시에 올릴 때 1번만 변환)
+# - str: 문자열 (ID 등, 앞뒤 공백 제거)   - category: 반복되는 값 (메모리 절약)
+# - int: 정수 (변환 실패/빈칸은 기본값)   - datetime: datetime64 (형식 불일치는 NaT)
+# - week: 파생 컬럼 Week_ID (주 번호 정수, modules/weeks.py) <- (원본 컬럼, "time" 월 09:00 기준 | "date" 월 0시 기준)
+COLUMN_TYPES = {
+    "Users": {
+        "str": ["Student_ID", "Name", "Password", "Role"],
+        "datetime": {"Start_Date": "%Y-%m-%d"},
+    },
+    "Homework_List": {
+        "str": ["Student_ID", "Task_Name", "Custom_Text"],
+        "category": ["Category"],
+        "int": {"Weekly_Goal": 1},
+    },
+    "Homework_Log": {
+        "str": ["Student_ID", "Task_Name", "Log_ID"],
+        "category": ["Day_of_Week"],
+        "datetime": {"Completed_At": "%Y-%m-%d %H:%M:%S"},
+        "week": ("Completed_At", "time"),
+    },
+    "Exam_Results": {
+        "str": ["Student_ID", "Range"],
+        "datetime": {"Date": "%Y-%m-%d"},
+        "week": ("Date", "date"),
+    },
+    "Weekly_History": {
+        "str": ["Student_ID"],
+        "category": ["Category"],
+        "int": {"Goal_Snapshot": 0, "Done_Snapshot": 0},
+        "datetime": {"Week_Start_Date": "%Y-%m-%d"},
+        "week": ("Week_Start_Date", "date"),
+    },
+}
+
+def normalize_frame(sheet_name, records):
+    """레코드 리스트 -> 타입이 정리된 DataFrame"""
+    df = pd.DataFrame(records)
+    if df.empty: return df
+    df.columns = df.columns.str.strip()
+    types = COLUMN_TYPES.get(sheet_name, {})
+    for col in types.get("str", []):
+        if col in df.columns:
+            df[col] = df[col].astype(str).str.strip()
+    for col in types.get("category", []):
+        if col in df.columns:
+            df[col] = df[col].astype(str).str.strip().astype("category")
+    for col, default in types.get("int", {}).items():
+        if col in df.columns:
+            num = pd.to_numeric(df[col], errors="coerce")
+            valid = num.notna()
+            if default: valid &= num != 0 # 0/빈칸은 기본값 (예: 주간목표 0 -> 1회)
+            df[col] = num.where(valid, default).astype("int64")
+    for col, fmt in types.get("datetime", {}).items():
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col].astype(str).str.strip(), format=fmt, errors="coerce")
+    if "week" in types:
+        col, kind = types["week"]
+        if col in df.columns:
+            df["Week_ID"] = weeks.week_ids(df[col]) if kind == "time" else weeks.date_week_ids(df[col])
+    return df
+
+# 세대(version)당 1번만 변환. 모든 세션이 같은 객체 공유 -> 읽기 전용으로만 사용할 것
+def _typed_frame(sheet_name, version):
+    return snapshots.get(sheet_name, "frame", version, lambda: normalize_frame(sheet_name, mirror.records(sheet_name)))
+
+_EMPTY_FRAME = pd.DataFrame()
+
+def get_data(sheet_name):
+    """시트 전체 (타입 정규화된 DataFrame, 실패 시 빈 DataFrame)"""
+    if doc is None: return _EMPTY_FRAME
     try:
-        users = user_sheet.get_all_records()
-        return [f"{u['Student_ID']} ({u['Name']})" for u in users if str(u.get('Role','')).strip().lower() == 'student']
-    except: return []
+        _ensure_mirror(sheet_name)
+        return _typed_frame(sheet_name, mirror.version(sheet_name))
+    except: return _EMPTY_FRAME
+
+# [학생별 인덱스] 시트를 Student_ID 로 미리 묶어 둔 dict (세대당 1번만 계산)
+# - 조회는 dict 한 번 (O(1)), 문자열 변환/전체 스캔 없음
+def _group_by_student(df):
+    if df.empty or "Student_ID" not in df.columns: return MappingProxyType({})
+    return MappingProxyType({sid: group.reset_index(drop=True) for sid, group in df.groupby("Student_ID", sort=False)})
+
+def _build_partitions(sheet_name, version):
+    return snapshots.get(sheet_name, "partitions", version, lambda: _group_by_student(_typed_frame(sheet_name, version)))
 
-def get_homework_list(student_id):
-    if homework_list_sheet is None: return []
+def get_quota_status():
+    """시트 API 사용량 (최근 1분, 한도 대비)"""
+    return quota.status()
+
+def get_partitions(sheet_name):
+    """{Student_ID(str): 해당 학생 행 DataFrame}"""
+    if doc is None: return {}
     try:
-        all_hw = homework_list_sheet.get_all_records()
-        return [h for h in all_hw if str(h['Student_ID']) == str(student_id)]
-    except: return []
+        _ensure_mirror(sheet_name)
+        return _build_partitions(sheet_name, mirror.version(sheet_name))
+    except: return {}
+
+# [학생 1명] 미러의 학생 인덱스로 그 학생 행만 읽어 정규화, 학생 세대(partition_version)마다 1번
+# - 다른 학생의 쓰기(시트 세대 증가)로는 다시 만들지 않음 -> 체크 직후 조회도 시트 전체를 다시 묶지 않음
+def _student_frame(sheet_name, sid, version):
+    return snapshots.get(sheet_name, "rows", version, lambda: normalize_frame(sheet_name, mirror.records(sheet_name, sid)), key=sid)
 
-def get_weekly_history(student_id):
-    if weekly_history_sheet is None: return []
+def get_student_rows(sheet_name, student_id):
+    """학생 1명의 행만 담은 DataFrame (없으면 빈 DataFrame)"""
+    sid = str(student_id).strip()
+    if doc is None: return _EMPTY_FRAME
     try:
-        rows = weekly_history_sheet.get_all_records()
-        return [r for r in rows if str(r.get("Student_ID")) == str(student_id)]
-    except: return []
+        _ensure_mirror(sheet_name)
+        return _student_frame(sheet_name, sid, mirror.partition_version(sheet_name, sid))
+    except: return _EMPTY_FRAME
+
+def get_student_snapshot(sheet_name, student_id, kind, build):
+    """
+    학생 1명의 행으로 만든 파생 데이터 build(rows) 를 학생 세대당 1번만 만들어 모든 세션이 공유.
+    build 는 읽기 전용 객체(MappingProxyType/frozenset/tuple)를 반환할 것.
+    """
+    sid = str(student_id).strip()
+    if doc is None: return build(_EMPTY_FRAME)
+    try: _ensure_mirror(sheet_name)
+    except: pass
+    version = mirror.partition_version(sheet_name, sid) # 행보다 먼저 읽음 (사이에 바뀌면 다음 조회 때 다시 만듦)
+    return snapshots.get(sheet_name, kind, version, lambda: build(_student_frame(sheet_name, sid, version)), key=sid)
 
-# [데이터 쓰기 함수들: 실행 후 캐시 초기화(st.cache_data.clear) 추가]
+# [지난 주 기록] (학생, 주) 1개만: 미러의 주 인덱스로 범위 조회 (Homework_Log + Log_Archive)
+# - 시트/전체 미러를 읽지 않음, (학생, 주)별 스냅샷으로 공유
+# - Log_Archive 가 없으면 Homework_Log 만 사용
+LOG_SHEETS = TAIL_SYNCED_SHEETS + ["Homework_Log"] # 오래된 순
 
-def add_homework_assignment(student_id, category, task_name, custom_text, weekly_goal):
-    if homework_list_sheet is None: return False
+def _ensure_log_mirrors():
+    _ensure_mirror("Homework_Log")
+    for name in TAIL_SYNCED_SHEETS:
+        if mirror.synced_at(name) == 0:
+            sync_tail(name)
+
+def get_week_logs(student_id, week_id):
+    """학생 1명의 week_id 주 수행 기록 (타입 정규화된 DataFrame, 보관된 기록 포함)"""
+    sid = str(student_id).strip()
+    if doc is None: return _EMPTY_FRAME
     try:
-        homework_list_sheet.append_row([student_id, category, task_name, custom_text, weekly_goal])
-        st.cache_data.clear() # 데이터 변경 시 캐시 삭제
-        return True
-    except: return False
+        _ensure_log_mirrors()
+        version = tuple(mirror.partition_version(name, sid) for name in LOG_SHEETS)
+        build = lambda: normalize_frame("Homework_Log", [r for name in LOG_SHEETS for r in mirror.week_records(name, sid, week_id)])
+        return snapshots.get("Homework_Log", "week_logs", version, build, key=(sid, int(week_id)))
+    except: return _EMPTY_FRAME
 
-def add_homework_log(student_id, task_name, day_of_week):
-    if homework_log_sheet is None: return
+def get_log_week_range(student_id):
+    """학생 1명 기록이 있는 (가장 이른 주, 가장 늦은 주) (보관된 기록 포함). 없으면 None"""
+    if doc is None: return None
     try:
-        now = datetime.now(pytz.timezone('Asia/Seoul')).strftime("%Y-%m-%d %H:%M:%S")
-        homework_log_sheet.append_row([student_id, task_name, now, day_of_week])
-        st.cache_data.clear() # 데이터 변경 시 캐시 삭제
-    except: pass
+        _ensure_log_mirrors()
+        found = [r for r in (mirror.week_range(name, student_id) for name in LOG_SHEETS) if r]
+    except: return None
+    if not found: return None
+    return (min(r[0] for r in found), max(r[1] for r in found))
 
-def delete_homework_log(student_id, task_name, day_of_week):
+def get_memory_report():
+    """공용 스냅샷(시트별) / 세션 오버레이(세션별) 바이트 수와 예산"""
+    return snapshots.report()
+
+def get_all_users():
+    users = get_data("Users")
+    if users.empty or "Role" not in users.columns: return []
+    students = users[users["Role"].str.lower() == "student"]
+    return [f"{sid} ({name})" for sid, name in zip(students["Student_ID"], students["Name"])]
+
+# [데이터 쓰기 함수들: 시트 쓰기 성공 후 미러 반영 -> 해당 시트/학생의 세대 카운터만 증가]
+
+def new_log_id():
+    return uuid.uuid4().hex[:12]
+
+def add_homework_logs(entries):
+    """여러 건의 수행 기록을 append_rows 한 번으로 저장.
+    entries: [(student_id, task_name, day_of_week[, completed_at]), ...] (completed_at 이 없으면 지금 시각)"""
     if homework_log_sheet is None: return False
     try:
-        logs = homework_log_sheet.get_all_values()
-        for i in range(len(logs) - 1, 0, -1):
-            row = logs[i]
-            if str(row[0]) == str(student_id) and str(row[1]) == str(task_name) and str(row[3]) == str(day_of_week):
-                homework_log_sheet.delete_rows(i + 1) 
-                st.cache_data.clear() # 데이터 변경 시 캐시 삭제
-                return True
+        now = datetime.now(pytz.timezone('Asia/Seoul')).strftime("%Y-%m-%d %H:%M:%S")
+        rows = [[e[0], e[1], e[3] if len(e) > 3 else now, e[2], new_log_id()] for e in entries]
+        try:
+            homework_log_sheet.append_rows(rows)
+        except Exception:
+            # 응답이 실패여도 시트에는 추가됐을 수 있음 -> 다시 읽어서 Log_ID 로 확인 (다시 보내면 중복)
+            sync_sheet("Homework_Log")
+            if not _logs_landed(rows): raise
+        else:
+            mirror.append_rows("Homework_Log", _to_records("Homework_Log", rows))
+        refresh_stats(e[0] for e in entries)
+        return True
+    except Exception as e:
+        print(f"수행 기록 저장 실패: {e}")
         return False
-    except: return False
 
-def reset_student_homework(student_id):
-    if homework_list_sheet is None: return False
+def _logs_landed(rows):
+    for sid in {str(r[0]) for r in rows}:
+        saved = {str(rec.get("Log_ID", "")) for rec in mirror.records("Homework_Log", sid)}
+        if any(str(r[4]) not in saved for r in rows if str(r[0]) == sid): return False
+    return True
+
+# 행 번호로 지우는 작업(체크 취소 / 아카이브)이 서로 끼어들지 않도록
+_log_rows_lock = threading.Lock()
+
+def _find_log_row(student_id, task_name, day_of_week):
+    # 미러의 (학생, 숙제, 요일) -> 행 번호 인덱스 조회 후, 그 한 행만 읽어 실제 시트와 일치하는지 확인
+    hit = mirror.find_last_row("Homework_Log", (student_id, task_name, day_of_week))
+    if hit is None: return None
+    row_no, record = hit
+    header = HEADERS["Homework_Log"]
+    live = _to_records("Homework_Log", [homework_log_sheet.row_values(row_no)])[0]
+    if any(str(live.get(h, "")) != str(record[h]) for h in header if h in record):
+        return False # 미러와 시트가 어긋남
+    return row_no
+
+def delete_homework_log(student_id, task_name, day_of_week):
+    if homework_log_sheet is None: return False
     try:
-        all_rows = homework_list_sheet.get_all_values()
-        header = all_rows[0]
-        new_rows = [row for row in all_rows[1:] if str(row[0]) != str(student_id)]
-        homework_list_sheet.clear()
-        homework_list_sheet.append_row(header)
-        if new_rows: homework_list_sheet.append_rows(new_rows)
-        st.cache_data.clear() # 데이터 변경 시 캐시 삭제
+        _ensure_mirror("Homework_Log")
+        with _log_rows_lock:
+            row_no = _find_log_row(student_id, task_name, day_of_week)
+            if not row_no:
+                # 인덱스에 없거나(None) 시트와 어긋난(False) 경우에만 전체 재동기화 후 한 번 더 시도
+                sync_sheet("Homework_Log")
+                row_no = _find_log_row(student_id, task_name, day_of_week)
+                if row_no is None: return True # 최신 시트에도 없음 -> 이미 지워진 상태
+            if not row_no: return False
+            homework_log_sheet.delete_rows(row_no)
+            mirror.delete_row("Homework_Log", row_no)
+        refresh_stats([student_id])
         return True
     except: return False
 
+def _cell(value):
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return {"userEnteredValue": {"stringValue": str(value)}}
+    return {"userEnteredValue": {"numberValue": value}}
+
+def _row_ranges(row_nos):
+    # [7, 3, 4, 5] -> [(7, 7), (3, 5)] : 아래쪽 구간부터 (삭제 시 행 번호가 밀리지 않도록)
+    ranges = []
+    for r in sorted(row_nos, reverse=True):
+        if ranges and ranges[-1][0] == r + 1:
+            ranges[-1] = (r, ranges[-1][1])
+        else:
+            ranges.append((r, r))
+    return ranges
+
+def save_student_homework(student_id, assignments):
+    """
+    학생 1명의 숙제 목록을 편집 결과(assignments)와 같게 맞춤.
+    현재 행과 비교(diff)하여 수정/삭제/추가만 한 번의 batch_update 로 전송 (다른 학생 행은 건드리지 않음).
+    assignments: [(category, task_name, custom_text, weekly_goal), ...]
+    반환: {"inserted": n, "updated": n, "deleted": n} / 실패 시 None
+    """
+    if homework_list_sheet is None: return None
+    try:
+        # 행 번호 기준으로 수정하므로 최신 상태에서 diff
+        sync_sheet("Homework_List")
+        sid = str(student_id)
+        header = HEADERS["Homework_List"]
+        current = mirror.numbered_records("Homework_List", sid)
+
+        by_key = {}
+        for row_no, rec in current:
+            by_key.setdefault((str(rec.get("Category")), str(rec.get("Task_Name"))), []).append((row_no, rec))
+
+        updates, inserts = [], []
+        for category, task_name, custom_text, weekly_goal in assignments:
+            new_row = [sid, category, task_name, custom_text, weekly_goal]
+            matches = by_key.get((str(category), str(task_name)))
+            if matches:
+                row_no, rec = matches.pop(0)
+                old_row = [str(rec.get(h, "")) for h in header]
+                if old_row != [str(v) for v in new_row]:
+                    updates.append((row_no, new_row))
+            else:
+                inserts.append(new_row)
+        deletes = [row_no for matches in by_key.values() for row_no, _ in matches]
+
+        if not (updates or inserts or deletes):
+            return {"inserted": 0, "updated": 0, "deleted": 0}
+
+        # 순서: 수정(원래 행 번호) -> 삭제(아래에서 위로) -> 맨 끝에 추가
+        sheet_id = homework_list_sheet.id
+        requests = []
+        for row_no, new_row in updates:
+            requests.append({"updateCells": {
+                "range": {"sheetId": sheet_id, "startRowIndex": row_no - 1, "endRowIndex": row_no,
+                          "startColumnIndex": 0, "endColumnIndex": len(new_row)},
+                "rows": [{"values": [_cell(v) for v in new_row]}],
+                "fields": "userEnteredValue",
+            }})
+        for start, end in _row_ranges(deletes):
+            requests.append({"deleteDimension": {
+                "range": {"sheetId": sheet_id, "dimension": "ROWS", "startIndex": start - 1, "endIndex": end},
+            }})
+        if inserts:
+            requests.append({"appendCells": {
+                "sheetId": sheet_id,
+                "rows": [{"values": [_cell(v) for v in row]} for row in inserts],
+                "fields": "userEnteredValue",
+            }})
+        try:
+            doc.batch_update({"requests": requests})
+        except Exception:
+            # 반영 여부를 알 수 없음 -> 미러를 시트에 맞춰 두고 실패로 반환 (다음 저장은 새 상태에서 diff)
+            sync_sheet("Homework_List")
+            refresh_stats([sid])
+            raise
+
+        # 미러에도 같은 결과 반영
+        changed = dict(updates)
+        removed = set(deletes)
+        new_records = []
+        for row_no, rec in mirror.numbered_records("Homework_List"):
+            if row_no in removed: continue
+            new_records.append(_to_records("Homework_List", [changed[row_no]])[0] if row_no in changed else rec)
+        new_records += _to_records("Homework_List", inserts)
+        mirror.replace_sheet("Homework_List", new_records)
+        refresh_stats([sid])
+        return {"inserted": len(inserts), "updated": len(updates), "deleted": len(deletes)}
+    except Exception as e:
+        print(f"숙제 저장 실패: {e}")
+        return None
+
 def add_weekly_history(rows_data):
     if weekly_history_sheet is None: return False
     try:
         weekly_history_sheet.append_rows(rows_data)
-        st.cache_data.clear() # 데이터 변경 시 캐시 삭제
+        mirror.append_rows("Weekly_History", _to_records("Weekly_History", rows_data))
+        refresh_stats(row[0] for row in rows_data)
         return True
     except Exception as e:
         print(f"히스토리 저장 실패: {e}")
         return False
 
-def archive_old_logs(days=30):
+# ---------------------------------------------------------
+# 6. 로그 아카이브 (★증분 처리: 오래된 앞부분만 잘라서 이동★)
+# ---------------------------------------------------------
+# Homework_Log 는 시간순으로 뒤에 추가되므로, 오래된 기록은 항상 맨 앞(2행~)에 몰려 있음.
+# -> 앞에서부터 정해진 크기만큼만 읽고, 기준일 이전인 연속 구간만 옮긴 뒤 그 행 범위만 삭제.
+#    (남길 행을 다시 쓰지 않으므로, 그 사이의 체크 기록이 사라지지 않음)
+ARCHIVE_CHUNK_ROWS = 500
+ARCHIVE_WATERMARK_KEY = "archive_watermark"   # 마지막으로 옮긴 행의 Completed_At
+ARCHIVE_PENDING_KEY = "archive_pending"       # 복사는 끝났지만 삭제 전인 구간 (중단 후 재실행 시 중복 방지)
+
+def _log_time(row):
+    """Completed_At 이 "YYYY-MM-DD HH:MM:SS" 형식이면 그 문자열 (문자열 순서 = 시간 순서), 아니면 None"""
+    value = row[2].strip() if len(row) > 2 else ""
+    try:
+        datetime.strptime(value, "%Y-%m-%d %H:%M:%S")
+        return value
+    except ValueError:
+        return None
+
+def _archive_prefix_len(rows, cutoff_str):
+    # 맨 앞부터 기준일 이전인 연속 구간의 길이 (마지막 행은 항상 기준일 이전 기록)
+    # - 시각이 비었거나 형식이 다른 행은 앞뒤 기록과 함께 옮김 (맨 위에 하나만 있어도 정리가 멈추지 않도록)
+    # - 그 뒤에 기준일 이전 기록이 없으면 남겨 둠 (다음 실행 때 다시 판단)
+    n = 0
+    for i, row in enumerate(rows):
+        ts = _log_time(row)
+        if ts is None: continue
+        if ts >= cutoff_str: break
+        n = i + 1
+    return n
+
+def _archive_has(row):
+    # Log_Archive 꼬리를 미러로 받아 마지막 행이 row 인지 확인 (Log_ID 비교)
+    sync_tail("Log_Archive")
+    last = mirror.last_record("Log_Archive")
+    return last is not None and str(last.get("Log_ID", "")) == str(row[4])
+
+def archive_old_logs(days=30, chunk_rows=ARCHIVE_CHUNK_ROWS, max_chunks=None):
     if doc is None: return "DB 연결 실패"
     
     try:
@@ -176,44 +622,216 @@ def archive_old_logs(days=30):
         except:
             return "❌ 필수 시트(Homework_Log 또는 Log_Archive)가 없습니다."
 
-        all_logs = log_sheet.get_all_values()
-        if len(all_logs) <= 1: return "데이터 없음"
-        
-        header = all_logs[0]
-        data_rows = all_logs[1:]
-        
         kst = pytz.timezone('Asia/Seoul')
-        cutoff_date = datetime.now(kst) - pd.Timedelta(days=days)
+        cutoff_str = (datetime.now(kst) - pd.Timedelta(days=days)).strftime("%Y-%m-%d %H:%M:%S")
+        width = len(HEADERS["Homework_Log"])
+        last_col = chr(ord("A") + width - 1)
         
-        rows_to_archive = []
-        rows_to_keep = []
-        
-        for row in data_rows:
-            try:
-                if len(row) > 2:
-                    log_date_str = row[2] 
-                    log_date = datetime.strptime(log_date_str, "%Y-%m-%d %H:%M:%S").replace(tzinfo=kst)
-                    
-                    if log_date < cutoff_date:
-                        rows_to_archive.append(row)
-                    else:
-                        rows_to_keep.append(row)
+        started = time.time()
+        moved = 0
+        unparsable = 0
+        chunks = 0
+        while max_chunks is None or chunks < max_chunks:
+            rows = log_sheet.get(f"A2:{last_col}{chunk_rows + 1}")
+            if not rows: break
+            rows = [list(r) + [""] * (width - len(r)) for r in rows]
+
+            with _log_rows_lock:
+                pending = mirror.get_meta(ARCHIVE_PENDING_KEY)
+                if pending and rows[:pending["count"]][-1:] == [pending["last"]] and rows[0] == pending["first"]:
+                    # 지난 실행이 삭제 전에 중단됨 -> 복사가 반영됐는지 Log_Archive 끝부분으로 확인
+                    n = pending["count"]
+                    if not pending.get("copied") and not _archive_has(rows[n - 1]):
+                        archive_sheet.append_rows(rows[:n])
                 else:
-                    rows_to_keep.append(row)
-            except:
-                rows_to_keep.append(row)
-        
-        if rows_to_archive:
-            archive_sheet.append_rows(rows_to_archive)
-            log_sheet.clear()
-            log_sheet.append_row(header)
-            if rows_to_keep:
-                log_sheet.append_rows(rows_to_keep)
-            
-            st.cache_data.clear() # 데이터 변경 시 캐시 삭제
-            return f"✅ {len(rows_to_archive)}개의 기록을 정리했습니다."
+                    n = _archive_prefix_len(rows, cutoff_str)
+                    if n == 0 and len(rows) == chunk_rows and all(_log_time(row) is None for row in rows):
+                        return f"❌ Homework_Log 2~{chunk_rows + 1}행의 Completed_At 이 모두 비었거나 형식이 다릅니다. (정리 {moved}개 후 중단)"
+                    if n == 0: break
+                    # 복사 전에 먼저 기록: 응답이 실패여도 복사됐을 수 있으므로 다음 실행이 확인 후 결정
+                    mirror.set_meta(ARCHIVE_PENDING_KEY, {"count": n, "first": rows[0], "last": rows[n - 1], "copied": False})
+                    archive_sheet.append_rows(rows[:n])
+                mirror.set_meta(ARCHIVE_PENDING_KEY, {"count": n, "first": rows[0], "last": rows[n - 1], "copied": True})
+
+                log_sheet.delete_rows(2, n + 1)
+                mirror.delete_rows("Homework_Log", 2, n + 1)
+                mirror.set_meta(ARCHIVE_PENDING_KEY, None)
+                mirror.set_meta(ARCHIVE_WATERMARK_KEY, rows[n - 1][2])
+
+            moved += n
+            unparsable += sum(_log_time(row) is None for row in rows[:n])
+            chunks += 1
+            if n < len(rows): break # 기준일 이후 기록에 도달
+
+        elapsed = max(time.time() - started, 1e-6)
+        if moved:
+            try: sync_tail("Log_Archive") # 옮긴 기록을 지난 주 기록 조회용 미러에 반영
+            except Exception as e: print(f"Mirror Tail Sync Error (Log_Archive): {e}")
+            note = f", 완료 시각이 없거나 형식이 다른 기록 {unparsable}개 포함" if unparsable else ""
+            return f"✅ {moved}개의 기록을 정리했습니다. ({chunks}회 분할, {moved / elapsed:.0f} rows/sec, 기준: {mirror.get_meta(ARCHIVE_WATERMARK_KEY)}까지{note})"
         else:
             return "🧹 정리할 데이터가 없습니다."
             
     except Exception as e:
         return f"❌ 아카이빙 실패: {str(e)}"
+
+# ---------------------------------------------------------
+# 7. 학생별 통계 (★(학생, 주, 영역) -> 목표/완료, 미러에 저장★)
+# ---------------------------------------------------------
+# 대시보드/관리자 화면은 이 표의 숫자만 읽음 (지난 기록 전체를 매번 다시 합산하지 않음)
+# - 지난 주: Weekly_History (마감된 기록) / 이번 주: 배정된 숙제 + 이번 주 기록·시험 (주 인덱스로 조회)
+# - 쓰기 함수가 미러 반영 직후 그 학생만 갱신: 보통은 이번 주 행만 다시 계산,
+#   Weekly_History 가 바뀌었거나 주가 넘어갔으면 그 학생 전체를 다시 계산
+# - 백그라운드 동기화/다른 프로세스로 바뀐 경우: 조회 시 원본 세대를 비교해서 다시 계산
+# - 시험 결과를 추가하는 쓰기 함수가 생기면 미러 반영 후 _refresh_stats 를 호출할 것
+STATS_SOURCES = ["Homework_List", "Homework_Log", "Exam_Results", "Weekly_History"]
+
+def is_exam_task(category, task_name):
+    return ("시험" in category) or ("Test" in category) or ("시험" in task_name)
+
+def _stats_sources(sid):
+    return [mirror.partition_version(name, sid) for name in STATS_SOURCES]
+
+# 학생 1명 분량(수십~수백 행)에서는 pandas 연산 1번의 고정 비용이 행 반복보다 커서,
+# 열을 한 번에 꺼낸 뒤(numpy 마스크 / tolist) 한 번만 훑어서 셈 (iterrows / 숙제마다 기록 다시 거르기 X)
+# 원래 대시보드 집계와의 결과 비교: tests/test_dashboard_stats.py / 속도: python jobs.py bench
+def _history_stats(history):
+    """Weekly_History 행 -> {(주, 영역): [목표, 완료]} (영역은 처음 나온 순서)"""
+    out = {}
+    for key, goal, done in zip(
+        zip(history["Week_ID"].tolist(), history["Category"].tolist()),
+        history["Goal_Snapshot"].tolist(), history["Done_Snapshot"].tolist(),
+    ):
+        entry = out.get(key)
+        if entry is None: out[key] = [goal, done]
+        else:
+            entry[0] += goal
+            entry[1] += done
+    return out
+
+def _live_stats(missions, logs, exams, this_week_id):
+    """
+    이번 주 -> {영역: [목표, 완료]}
+    - 완료: 시험은 이번 주 같은 범위의 시험 수, 나머지는 이번 주 체크 기록 수
+    """
+    log_counts, exam_counts = {}, {}
+    if not logs.empty:
+        log_counts = Counter(logs["Task_Name"].to_numpy()[logs["Week_ID"].to_numpy() == this_week_id].tolist())
+    if not exams.empty:
+        exam_counts = Counter(exams["Range"].to_numpy()[exams["Week_ID"].to_numpy() == this_week_id].tolist())
+
+    out = {}
+    for category, task_name, custom_text, weekly_goal in zip(
+        missions["Category"].tolist(), missions["Task_Name"].tolist(),
+        missions["Custom_Text"].tolist(), missions["Weekly_Goal"].tolist(),
+    ):
+        full_name = f"{task_name} ({custom_text})"
+        entry = out.setdefault(category, [0, 0])
+        entry[0] += weekly_goal
+        entry[1] += exam_counts.get(custom_text, 0) if is_exam_task(category, task_name) else log_counts.get(full_name, 0)
+    return out
+
+def _refresh_stats(student_id):
+    """학생 1명의 통계를 원본 미러와 맞춤 (이미 맞으면 아무것도 안 함)"""
+    sid = str(student_id).strip()
+    this_week_id = weeks.current_week_id()
+    sources = _stats_sources(sid) # 행보다 먼저 읽음 (사이에 바뀌면 다음 조회 때 다시 계산)
+    state = mirror.stats_state(sid)
+    if state == (this_week_id, sources): return
+
+    def rows_of(sheet_name, week_id=None):
+        records = mirror.records(sheet_name, sid) if week_id is None else mirror.week_records(sheet_name, sid, week_id)
+        return normalize_frame(sheet_name, records)
+
+    missions = rows_of("Homework_List")
+    live = _live_stats(missions, rows_of("Homework_Log", this_week_id), rows_of("Exam_Results", this_week_id), this_week_id) \
+        if not missions.empty else {}
+
+    # 마감된 주가 그대로면 이번 주 행만 교체
+    live_only = state is not None and state[0] == this_week_id and state[1][-1] == sources[-1]
+    if live_only:
+        seq = {}
+        for _, category, _, s, _, _ in mirror.stats_rows(sid, live=0): seq.setdefault(category, s)
+        rows = []
+    else:
+        history = rows_of("Weekly_History")
+        closed = _history_stats(history) if not history.empty else {}
+        seq = {}
+        for (_, category) in closed: seq.setdefault(category, len(seq))
+        rows = [(wid, category, 0, seq[category], goal, done) for (wid, category), (goal, done) in closed.items()]
+
+    first_new = max(seq.values(), default=-1) + 1
+    for category in live:
+        if category not in seq:
+            seq[category] = first_new
+            first_new += 1
+    rows += [(this_week_id, category, 1, seq[category], goal, done) for category, (goal, done) in live.items()]
+    mirror.put_stats(sid, this_week_id, sources, rows, live_only=live_only)
+
+def refresh_stats(student_ids):
+    """쓰기 직후 호출: 통계 갱신 실패는 쓰기 결과에 영향을 주지 않음 (다음 조회 때 다시 계산)"""
+    for sid in dict.fromkeys(str(s).strip() for s in student_ids):
+        try:
+            _refresh_stats(sid)
+        except Exception as e:
+            print(f"Stats Refresh Error ({sid}): {e}")
+
+def _stats_view(rows):
+    stats = {}
+    for _, category, live, _, goal, done in rows:
+        if category not in stats:
+            stats[category] = {"weekly_goal": 0, "weekly_done": 0, "total_goal": 0, "total_done": 0}
+        entry = stats[category]
+        entry["total_goal"] += goal
+        entry["total_done"] += done
+        if live:
+            entry["weekly_goal"] += goal
+            entry["weekly_done"] += done
+    return MappingProxyType({c: MappingProxyType(v) for c, v in stats.items()})
+
+def get_student_stats(student_id):
+    """
+    {영역: {"weekly_goal", "weekly_done", "total_goal", "total_done"}} (읽기 전용, 영역은 표시 순서)
+    - weekly_*: 이번 주, total_*: 마감된 주 합계 + 이번 주
+    """
+    sid = str(student_id).strip()
+    if doc is None: return MappingProxyType({})
+    try:
+        prefetch(STATS_SOURCES)
+        _refresh_stats(sid)
+        week_id, sources = mirror.stats_state(sid)
+        return snapshots.get("Stats", "student", (week_id, tuple(sources)), lambda: _stats_view(mirror.stats_rows(sid)), key=sid)
+    except Exception as e:
+        print(f"Stats Error ({sid}): {e}")
+        return MappingProxyType({})
+
+# [달성률 추이] 통계 표에서 기간만큼만 범위 조회 -> 서버에서 묶어서 점 개수를 줄인 뒤 전송
+# - 주 수가 TREND_WEEKLY_MAX 보다 많으면 월 단위로 합산 (달성률 = 합계 완료 / 합계 목표)
+TREND_WEEKLY_MAX = 26
+
+def _trend_frame(rows):
+    frame = pd.DataFrame(rows, columns=["Week_ID", "Category", "live", "seq", "goal", "done"])
+    frame = frame[(frame["Week_ID"] != weeks.NO_WEEK) & (frame["goal"] > 0)]
+    if frame.empty: return "week", frame
+    unit = "month" if frame["Week_ID"].nunique() > TREND_WEEKLY_MAX else "week"
+    starts = pd.to_datetime(frame["Week_ID"].map(weeks.week_start)).dt.normalize()
+    frame = frame.assign(Period=starts.dt.to_period("M").dt.start_time if unit == "month" else starts)
+    trend = frame.groupby(["seq", "Category", "Period"], sort=True)[["goal", "done"]].sum().reset_index()
+    trend["rate"] = (trend["done"] / trend["goal"] * 100).round(1)
+    return unit, trend.drop(columns="seq")
+
+def get_student_trend(student_id, since_week=None):
+    """
+    영역별 달성률 추이 -> (단위 "week" | "month", DataFrame[Category, Period, goal, done, rate])
+    - since_week: 이 주 번호부터 (None 이면 전체). 영역은 표시 순서, 기간은 시간 순서
+    """
+    sid = str(student_id).strip()
+    if doc is None: return "week", _EMPTY_FRAME
+    try:
+        get_student_stats(sid) # 통계 표를 원본과 맞춤
+        week_id, sources = mirror.stats_state(sid)
+        build = lambda: _trend_frame(mirror.stats_rows(sid, since_week=since_week))
+        return snapshots.get("Stats", "trend", (week_id, tuple(sources)), build, key=(sid, since_week))
+    except Exception as e:
+        print(f"Trend Error ({sid}): {e}")
+        return "week", _EMPTY_FRAME
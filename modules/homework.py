@@ -2,202 +2,264 @@
 
 import streamlit as st
 import pandas as pd
-import pytz 
-from datetime import datetime, timedelta
-from modules import db
+from datetime import timedelta
+from bisect import bisect_left, bisect_right
+from types import MappingProxyType
+from modules import db, writeback, snapshots, render, weeks
 
 # ---------------------------------------------------------
-# [Helper] 데이터 로딩 최적화 (Session State Caching)
+# [Helper] 데이터 로딩 최적화 (공용 스냅샷 + 세션 오버레이)
 # ---------------------------------------------------------
-def load_data_to_session(user_id, reset_time_naive):
+# - 숙제 목록 / 이번 주 체크 / 시험 색인은 프로세스 공용 읽기 전용 스냅샷 (학생 세대당 1번 계산, 세션은 참조만)
+# - 세션에는 내 낙관적 체크만 담은 오버레이 {숙제명: {요일: 원하는 상태}} 만 저장 -> 세션 메모리는 반 인원과 무관
+def _build_week(my_logs, this_week_id):
+    """({숙제명: 완료 요일 frozenset}, {숙제명: 횟수}) (이번 주 기록만)"""
+    done_days, task_cnt = {}, {}
+    if not my_logs.empty:
+        # 주 번호(Week_ID) 정수 비교로 이번 주 기록만
+        this_week = my_logs[my_logs["Week_ID"] == this_week_id]
+        for t_name, day in zip(this_week["Task_Name"], this_week["Day_of_Week"].astype(str)):
+            done_days.setdefault(t_name, set()).add(day)
+        task_cnt = this_week["Task_Name"].value_counts().to_dict()
+    return (MappingProxyType({t: frozenset(d) for t, d in done_days.items()}), MappingProxyType(task_cnt))
+
+def week_snapshot(user_id, this_week_id):
+    return db.get_student_snapshot("Homework_Log", user_id, ("week", this_week_id),
+                                   lambda rows: _build_week(rows, this_week_id))
+
+def exam_snapshot(user_id):
+    return db.get_student_snapshot("Exam_Results", user_id, "exam_index", index_exams)
+
+def _pending_checks(user_id):
+    checks = {}
+    for (t_name, day), want in writeback.pending_states(user_id).items():
+        checks.setdefault(t_name, {})[day] = want
+    return checks
+
+def session_checks(user_id, this_week_id):
+    """이 세션의 오버레이 (처음이면 아직 전송 대기 중인 체크로 채움)"""
+    return snapshots.overlay(st.session_state, "my_checks", (str(user_id), this_week_id),
+                             init=lambda: _pending_checks(user_id))
+
+def load_data_to_session(user_id, this_week_id):
     """
-    매번 DB를 읽지 않고, 세션에 데이터가 없거나 강제 갱신이 필요할 때만 DB를 읽습니다.
+    세션에는 오버레이만 준비.
+    시트에 이미 반영되어 스냅샷과 같아진 항목은 정리해서 오버레이를 작게 유지.
     """
-    # 1. 숙제 목록 (Homework_List) - 잘 안 바뀌므로 세션에 저장
-    if "my_hw_list" not in st.session_state:
-        raw_hw = db.get_data("Homework_List") # DB에서 읽기
-        if raw_hw:
-            df = pd.DataFrame(raw_hw)
-            # 내 숙제만 필터링하여 저장
-            st.session_state["my_hw_list"] = df[df["Student_ID"].astype(str) == str(user_id)]
-        else:
-            st.session_state["my_hw_list"] = pd.DataFrame()
-
-    # 2. 수행 기록 (Homework_Log) - 체크할 때마다 로컬 업데이트 + DB 백그라운드 전송 효과
-    if "my_done_map" not in st.session_state:
-        # 처음 한 번만 DB에서 읽어와서 '세트(Set)'로 만듦
-        raw_log = db.get_data("Homework_Log")
-        done_set = set()
-        task_cnt = {}
-        
-        if raw_log:
-            df_log = pd.DataFrame(raw_log)
-            # 내 기록만 필터링
-            my_logs = df_log[df_log["Student_ID"].astype(str) == str(user_id)]
-            
-            for _, row in my_logs.iterrows():
-                try:
-                    # 문자열을 날짜로 변환하여 이번 주 기록인지 확인
-                    completed_at_str = str(row.get("Completed_At"))
-                    completed_at = datetime.strptime(completed_at_str, "%Y-%m-%d %H:%M:%S")
-                    
-                    if completed_at >= reset_time_naive:
-                        t_name = row.get("Task_Name")
-                        day = row.get("Day_of_Week")
-                        done_set.add((t_name, day))
-                        task_cnt[t_name] = task_cnt.get(t_name, 0) + 1
-                except: continue
-        
-        st.session_state["my_done_map"] = done_set
-        st.session_state["my_task_counts"] = task_cnt
+    checks = session_checks(user_id, this_week_id)
+    base_days, _ = week_snapshot(user_id, this_week_id)
+    pending = writeback.pending_states(user_id)
+    for t_name in list(checks.data):
+        days = checks.data[t_name]
+        for day, want in list(days.items()):
+            if (t_name, day) not in pending and (day in base_days.get(t_name, ())) == want:
+                del days[day]
+        if not days: del checks.data[t_name]
+    return checks
+
+def is_done(checks, week, task_name, day):
+    base_days, _ = week
+    return checks.data.get(task_name, {}).get(day, day in base_days.get(task_name, ()))
+
+def task_count(checks, week, task_name):
+    """스냅샷 횟수 + 오버레이 차이 (숙제 1개당 최대 7요일 -> 상수 시간)"""
+    base_days, base_counts = week
+    days = base_days.get(task_name, ())
+    return base_counts.get(task_name, 0) + sum(int(want) - int(day in days) for day, want in checks.data.get(task_name, {}).items())
 
-    # 3. 시험 결과 (Exam_Results) - 시험 칠 때만 갱신
-    if "my_exam_results" not in st.session_state:
-        raw_exam = db.get_data("Exam_Results")
-        st.session_state["my_exam_results"] = pd.DataFrame(raw_exam) if raw_exam else pd.DataFrame()
+def index_exams(df_exam):
+    """{Range: (주 번호 tuple, 같은 순서의 점수 tuple)} (날짜순 정렬, 날짜 없는 행 제외, 같은 날짜는 원래 순서)"""
+    if df_exam.empty or "Range" not in df_exam.columns or "Date" not in df_exam.columns: return MappingProxyType({})
+    valid = df_exam[df_exam["Date"].notna()].sort_values("Date", kind="stable")
+    return MappingProxyType({rng: (tuple(group["Week_ID"]), tuple(group["Score"]))
+                             for rng, group in valid.groupby("Range", sort=False)})
+
+def scores_in_week(exam_index, exam_range, week_id):
+    """exam_range 시험 중 week_id 주의 점수 (날짜순, 정렬된 주 번호에서 이분 탐색)"""
+    wids, scores = exam_index.get(exam_range, ((), ()))
+    return list(scores[bisect_left(wids, week_id):bisect_right(wids, week_id)])
 
 # ---------------------------------------------------------
 # [Core] 날짜 및 유령 주간 계산
 # ---------------------------------------------------------
-def get_current_week_start():
-    KST = pytz.timezone('Asia/Seoul')
-    now = datetime.now(KST) 
-    today_weekday = now.weekday()
-    
-    if today_weekday == 0 and now.hour < 9:
-        days_to_subtract = 7
-    else:
-        days_to_subtract = today_weekday
-        
-    last_monday = now - timedelta(days=days_to_subtract)
-    return last_monday.replace(hour=9, minute=0, second=0, microsecond=0)
-
 def check_and_archive_missing_weeks(user_id):
     """
     마지막으로 저장된 History 날짜를 찾아, 
     그 이후부터 이번 주 전까지 비어있는 모든 주(Week)를 순차적으로 마감함.
     """
     # 1. 기준점 설정
-    this_monday = get_current_week_start()
-    this_monday_naive = this_monday.replace(tzinfo=None)
+    this_monday_naive = weeks.current_week_start().replace(tzinfo=None)
+    this_week_id = weeks.week_id(this_monday_naive)
     
     # 2. 사용자 정보에서 시작일 찾기
     start_monday = this_monday_naive 
     try:
-        users_data = db.get_data("Users")
-        df_users = pd.DataFrame(users_data)
-        u_row = df_users[df_users["Student_ID"].astype(str) == str(user_id)]
+        u_row = db.get_student_rows("Users", user_id)
         if not u_row.empty:
-            s_date_val = u_row.iloc[0]["Start_Date"]
-            if s_date_val and str(s_date_val).strip() != "":
-                start_dt = datetime.strptime(str(s_date_val), "%Y-%m-%d")
+            start_dt = u_row.iloc[0]["Start_Date"]
+            if pd.notna(start_dt):
+                start_dt = start_dt.to_pydatetime()
                 calc_start = start_dt - timedelta(days=start_dt.weekday())
                 start_monday = calc_start.replace(hour=9, minute=0, second=0, microsecond=0)
     except:
         start_monday = this_monday_naive
 
-    # 3. History 확인
-    history_data = db.get_weekly_history(user_id)
-    last_archived_date = None
-    if history_data:
-        dates = []
-        for r in history_data:
-            try: dates.append(datetime.strptime(r["Week_Start_Date"], "%Y-%m-%d"))
-            except: continue
-        if dates:
-            last_archived_date = max(dates).replace(hour=9, minute=0, second=0, microsecond=0)
-
-    # 4. 추적 시작점 결정
-    if last_archived_date:
-        next_check_date = last_archived_date + timedelta(days=7)
-    else:
-        next_check_date = start_monday
-
-    # 5. 루프 실행 (업데이트가 필요한 경우에만 True 반환)
+    # 3. History 확인 -> 추적 시작점 결정
+    next_check_date = _next_history_week(user_id, start_monday)
     if next_check_date.date() < this_monday_naive.date():
-        hw_list = db.get_data("Homework_List")
-        log_data = db.get_data("Homework_Log")
-        exam_data = db.get_data("Exam_Results")
-        
-        df_hw = pd.DataFrame(hw_list)
-        df_log = pd.DataFrame(log_data) if log_data else pd.DataFrame()
-        df_exam = pd.DataFrame(exam_data) if exam_data else pd.DataFrame()
-        
-        my_missions = df_hw[df_hw["Student_ID"].astype(str) == str(user_id)]
-        rows_to_insert = []
+        # 정기 작업(jobs.py rollover)이 방금 마감했을 수 있으므로 쓰기 직전에 히스토리를 새로 읽어 재확인
+        try:
+            db.sync_sheet("Weekly_History")
+        except Exception as e:
+            print(f"History Sync Error: {e}")
+        next_check_date = _next_history_week(user_id, start_monday)
 
-        while next_check_date.date() < this_monday_naive.date():
-            week_start = next_check_date
-            week_end = week_start + timedelta(days=7)
-            week_start_str = week_start.strftime("%Y-%m-%d")
-            
-            archive_stats = {} 
-            if not my_missions.empty:
-                for _, row in my_missions.iterrows():
-                    cat = row["Category"]
-                    task = row["Task_Name"]
-                    custom = row["Custom_Text"]
-                    try: goal = int(row.get("Weekly_Goal")) if row.get("Weekly_Goal") else 1
-                    except: goal = 1
-                        
-                    if cat not in archive_stats: archive_stats[cat] = {'goal': 0, 'done': 0}
-                    archive_stats[cat]['goal'] += goal
-                    
-                    is_exam = ("시험" in cat) or ("Test" in cat) or ("시험" in task)
-                    if is_exam and not df_exam.empty:
-                        my_exams = df_exam[(df_exam["Student_ID"].astype(str) == str(user_id)) & (df_exam["Range"].astype(str) == str(custom))]
-                        for _, r in my_exams.iterrows():
-                            try:
-                                d_date = datetime.strptime(str(r["Date"]), "%Y-%m-%d")
-                                if week_start.date() <= d_date.date() < week_end.date():
-                                    archive_stats[cat]['done'] += 1
-                            except: continue
-                    elif not is_exam and not df_log.empty:
-                        full_name = f"{task} ({custom})"
-                        my_logs = df_log[(df_log["Student_ID"].astype(str) == str(user_id)) & (df_log["Task_Name"] == full_name)]
-                        for _, r in my_logs.iterrows():
-                            try:
-                                l_date = datetime.strptime(str(r["Completed_At"]), "%Y-%m-%d %H:%M:%S")
-                                if week_start <= l_date < week_end:
-                                    archive_stats[cat]['done'] += 1
-                            except: continue
-            
-            for cat, stat in archive_stats.items():
-                rows_to_insert.append([str(user_id), week_start_str, cat, stat['goal'], stat['done']])
-            next_check_date += timedelta(days=7)
-        
+    # 4. 빈 주 전체를 한 번에 계산 (업데이트가 필요한 경우에만 True 반환)
+    first_week_id = weeks.week_id(next_check_date)
+    if first_week_id < this_week_id:
+        rows_to_insert = build_weekly_history_rows(
+            db.get_student_rows("Homework_List", user_id),
+            db.get_student_rows("Homework_Log", user_id),
+            db.get_student_rows("Exam_Results", user_id),
+            first_week_id, this_week_id - first_week_id,
+        )
         if rows_to_insert:
             db.add_weekly_history(rows_to_insert)
             return True
     return False
 
+def _next_history_week(user_id, start_monday):
+    """마지막으로 저장된 History 다음 주 (History 가 없으면 시작 주)"""
+    history = db.get_student_rows("Weekly_History", user_id)
+    if not history.empty:
+        last_date = history["Week_Start_Date"].max()
+        if pd.notna(last_date):
+            last_archived_date = last_date.to_pydatetime().replace(hour=9, minute=0, second=0, microsecond=0)
+            return last_archived_date + timedelta(days=7)
+    return start_monday
+
+def _week_counts(frame, key_col, first_week_id, n_weeks):
+    """(Student_ID, Key, Week_ID)별 건수 (first_week_id 부터 n_weeks 주)"""
+    if frame.empty or "Week_ID" not in frame.columns or key_col not in frame.columns:
+        return pd.Series(dtype="int64")
+    valid = frame["Week_ID"].between(first_week_id, first_week_id + n_weeks - 1)
+    counted = frame.loc[valid, ["Student_ID", key_col, "Week_ID"]]
+    return counted.groupby(["Student_ID", key_col, "Week_ID"]).size().rename_axis(["Student_ID", "Key", "Week"])
+
+def build_weekly_history_rows(missions, logs, exams, first_week_id, n_weeks):
+    """
+    first_week_id 부터 n_weeks 주 동안의 Weekly_History 행을 한 번에 계산 (여러 학생 가능).
+    - 기록/시험의 주 번호(Week_ID)로 한 번 묶고, 숙제 목록 x 주 격자에 붙여서 groupby 1번
+    - 기록은 [월 09:00, 다음 월 09:00), 시험은 날짜 기준 [월, 다음 월) (modules/weeks.py)
+    반환: [[Student_ID, Week_Start_Date, Category, Goal, Done], ...] (주 -> 카테고리 등장 순)
+    """
+    if missions.empty or n_weeks <= 0: return []
+
+    cat = missions["Category"].astype(str)
+    task = missions["Task_Name"].astype(str)
+    custom = missions["Custom_Text"].astype(str)
+    is_exam = cat.str.contains("시험") | cat.str.contains("Test") | task.str.contains("시험")
+    grid = pd.DataFrame({
+        "Student_ID": missions["Student_ID"].astype(str),
+        "Category": cat,
+        "Goal": missions["Weekly_Goal"].astype("int64"),
+        "Kind": is_exam.map({True: "exam", False: "log"}),
+        "Key": custom.where(is_exam, task + " (" + custom + ")"),
+    })
+    # 주 x 숙제 (주 순서 -> 숙제 순서 유지)
+    grid = pd.DataFrame({"Week": range(first_week_id, first_week_id + n_weeks)}).merge(grid, how="cross")
+
+    counts = {
+        "log": _week_counts(logs, "Task_Name", first_week_id, n_weeks),
+        "exam": _week_counts(exams, "Range", first_week_id, n_weeks),
+    }
+    counts = {kind: c for kind, c in counts.items() if not c.empty}
+    if counts:
+        done = pd.concat(counts, names=["Kind"]).rename("Done").reset_index()
+        grid = grid.merge(done, on=["Kind", "Student_ID", "Key", "Week"], how="left")
+        grid["Done"] = grid["Done"].fillna(0).astype("int64")
+    else:
+        grid["Done"] = 0
+
+    stats = grid.groupby(["Week", "Student_ID", "Category"], sort=False)[["Goal", "Done"]].sum().reset_index()
+    week_str = {wid: weeks.week_start(wid).strftime("%Y-%m-%d") for wid in range(first_week_id, first_week_id + n_weeks)}
+    return [[sid, week_str[w], c, int(g), int(d)] for sid, w, c, g, d in
+            zip(stats["Student_ID"], stats["Week"], stats["Category"], stats["Goal"], stats["Done"])]
+
+
+# ---------------------------------------------------------
+# [Job] 반 전체 주간 마감 (헤드리스, jobs.py rollover)
+# ---------------------------------------------------------
+def _rows_of(frame, student_ids):
+    if frame.empty or "Student_ID" not in frame.columns: return frame
+    return frame[frame["Student_ID"].isin(student_ids)]
+
+def rollover_weekly_history():
+    """
+    모든 학생의 지난 주(들)를 한 번에 마감해 Weekly_History 에 한 번의 append_rows 로 기록.
+    - 로그인하지 않은 학생도 마감됨 / 로그인 시 check_and_archive_missing_weeks 는 할 일이 없음
+    - 쓰기 직전에 시트를 새로 읽고, 각 학생의 마지막 History 다음 주부터만 계산 -> 여러 번 실행해도 중복 없음
+    """
+    this_monday_naive = weeks.current_week_start().replace(tzinfo=None)
+    this_week_id = weeks.week_id(this_monday_naive)
+    db.sync_sheets(["Users", "Homework_List", "Homework_Log", "Exam_Results", "Weekly_History"]) # 요청 1번
+
+    users = db.get_data("Users")
+    if users.empty or "Student_ID" not in users.columns: return "🧹 학생이 없습니다."
+    users = users.drop_duplicates("Student_ID").set_index("Student_ID")
+
+    # 학생별 추적 시작 주 번호 = 마지막 History 다음 주, 없으면 시작일이 속한 주 (NO_WEEK -> 결측)
+    start = users["Start_Date"] if "Start_Date" in users.columns else pd.Series(pd.NaT, index=users.index)
+    start_week = weeks.date_week_ids(start.dt.normalize())
+    next_week = start_week.where(start_week != weeks.NO_WEEK)
+    history = db.get_data("Weekly_History")
+    if not history.empty:
+        archived = history["Week_ID"].where(history["Week_ID"] != weeks.NO_WEEK)
+        last = archived.groupby(history["Student_ID"]).max() + 1
+        next_week = last.reindex(users.index).fillna(next_week)
+    next_week = next_week[next_week < this_week_id].astype("int64")
+    if next_week.empty: return "🧹 마감할 주가 없습니다."
+
+    missions = db.get_data("Homework_List")
+    logs = db.get_data("Homework_Log")
+    exams = db.get_data("Exam_Results")
+    rows_to_insert = []
+    # 보통은 모든 학생의 시작점이 같음(지난 주 월요일) -> 1번 계산
+    for first_week_id, sids in next_week.groupby(next_week).groups.items():
+        rows_to_insert += build_weekly_history_rows(
+            _rows_of(missions, sids), _rows_of(logs, sids), _rows_of(exams, sids),
+            int(first_week_id), this_week_id - int(first_week_id),
+        )
+    if not rows_to_insert: return "🧹 마감할 주가 없습니다."
+    if not db.add_weekly_history(rows_to_insert): return "❌ 히스토리 저장 실패"
+    students = len({r[0] for r in rows_to_insert})
+    return f"✅ 학생 {students}명, {len(rows_to_insert)}개의 주간 기록을 마감했습니다. (기준: {this_monday_naive.strftime('%Y-%m-%d')} 이전)"
+
 
 # ---------------------------------------------------------
 # [Action] 체크박스 클릭 핸들러 (Optimistic Update)
 # ---------------------------------------------------------
-def toggle_status(user_id, task_name, day, current_status):
+# 콜백 안에서 st.toast 등 요소를 그리면 조각(fragment) 재실행에서 지원되지 않으므로,
+# 알림 문구만 세션에 남기고 카드(show_task_card)가 그릴 때 표시
+TOAST_KEY = "checklist_toast" # (숙제 이름, 문구)
+
+def toggle_status(user_id, task_name, day, widget_key, this_week_id):
     """
     체크박스를 클릭했을 때 실행되는 콜백 함수입니다.
-    DB에 저장을 요청함과 동시에 세션(화면) 데이터를 즉시 수정하여 반응 속도를 높입니다.
+    DB 저장은 쓰기 지연 큐에 맡기고(즉시 반환), 세션 오버레이만 바로 수정합니다.
+    - 그려질 때의 값이 아니라 현재 상태(스냅샷 + 오버레이)와 비교: 이미 그 상태면(더블 클릭 등) 아무것도 안 함
     """
-    # 1. DB 업데이트 (가장 느림 - 백그라운드처럼 처리)
-    if not current_status:
-        db.add_homework_log(user_id, task_name, day)
-        # 2. 세션 상태 즉시 업데이트 (화면 갱신용)
-        st.session_state["my_done_map"].add((task_name, day))
-        st.toast(f"👍 [{day}] 완료!")
-    else:
-        db.delete_homework_log(user_id, task_name, day)
-        # 2. 세션 상태 즉시 업데이트
-        if (task_name, day) in st.session_state["my_done_map"]:
-            st.session_state["my_done_map"].remove((task_name, day))
-        st.toast(f"↩️ [{day}] 취소")
-    
-    # 3. 카운트 재계산 (그래프/텍스트 갱신용)
-    new_count = 0
-    for (t, d) in st.session_state["my_done_map"]:
-        if t == task_name: new_count += 1
-    st.session_state["my_task_counts"][task_name] = new_count
+    want = bool(st.session_state.get(widget_key))
+    checks = session_checks(user_id, this_week_id)
+    if is_done(checks, week_snapshot(user_id, this_week_id), task_name, day) == want:
+        return
+
+    # 1. DB 업데이트 요청 (백그라운드 워커가 모아서 전송)
+    writeback.enqueue_toggle(user_id, task_name, day, not want, want)
+
+    # 2. 오버레이 즉시 업데이트 (화면 갱신용, 카운트는 그릴 때 스냅샷 + 오버레이로 계산)
+    checks.data.setdefault(task_name, {})[day] = want
+    st.session_state[TOAST_KEY] = (task_name, f"👍 [{day}] 완료!" if want else f"↩️ [{day}] 취소")
 
 
 # ---------------------------------------------------------
@@ -209,8 +271,11 @@ def show_tracker():
         st.error("로그인이 필요합니다.")
         return
 
-    reset_time = get_current_week_start()
-    reset_time_naive = reset_time.replace(tzinfo=None)
+    db.prefetch() # 최초 기동 시 필요한 시트를 요청 1번으로
+
+    # 이번 주 기준은 요청당 1번만 계산해서 아래로 전달
+    reset_time = weeks.current_week_start()
+    this_week_id = weeks.week_id(reset_time.replace(tzinfo=None))
 
     # 1. [Heavy Task] 유령 주간 체크 (세션당 1회만 수행)
     if "history_checked" not in st.session_state:
@@ -220,8 +285,8 @@ def show_tracker():
             if updated:
                 st.toast("✅ 지난 학습 기록이 동기화되었습니다.")
 
-    # 2. [Optimized Task] 데이터 로드 (세션 캐시 활용)
-    load_data_to_session(user_id, reset_time_naive)
+    # 2. [Optimized Task] 데이터 로드 (공용 스냅샷 참조 + 세션 오버레이)
+    load_data_to_session(user_id, this_week_id)
 
     # 3. UI 그리기
     reset_str = reset_time.strftime("%m월 %d일")
@@ -233,11 +298,9 @@ def show_tracker():
     """, unsafe_allow_html=True)
     st.write("") 
 
-    # 세션에서 데이터 가져오기 (DB 직접 조회 X)
-    my_missions = st.session_state["my_hw_list"]
-    done_map = st.session_state["my_done_map"]
-    task_counts = st.session_state["my_task_counts"]
-    df_exam = st.session_state["my_exam_results"]
+    # 공용 스냅샷 가져오기 (복사 X, 시트 재조회 X)
+    my_missions = db.get_student_rows("Homework_List", user_id)
+    exam_index = exam_snapshot(user_id)
 
     if my_missions.empty:
         st.info("할당된 숙제가 없습니다.")
@@ -250,102 +313,144 @@ def show_tracker():
     exam_missions = my_missions[is_exam]
     routine_missions = my_missions[~is_exam]
 
-    # [Section 1] 시험 결과 (읽기 전용)
+    # [Section 1] 시험 결과 (읽기 전용) - 카드 전체를 HTML 한 덩어리로 (markdown 1번)
     if not exam_missions.empty:
         st.markdown("##### 🏆 단어 시험 결과")
-        cols = st.columns(2)
-        for idx, (_, row) in enumerate(exam_missions.iterrows()):
-            col_idx = idx % 2
-            custom = row["Custom_Text"]
-            task = row["Task_Name"]
-            try: goal = int(row.get("Weekly_Goal", 1))
-            except: goal = 1
-            
-            # 시험 점수 매칭
-            valid_matches = []
-            if not df_exam.empty:
-                match = df_exam[(df_exam["Student_ID"].astype(str) == str(user_id)) & 
-                                (df_exam["Range"].astype(str) == str(custom))]
-                for _, r in match.iterrows():
-                    try:
-                        if datetime.strptime(str(r["Date"]), "%Y-%m-%d").date() >= reset_time_naive.date():
-                            valid_matches.append(r)
-                    except: pass
-            
-            valid_matches.sort(key=lambda x: x['Date'])
-            
-            # (UI 렌더링: 코드 길이상 핵심 부분만 유지)
-            exam_cnt = len(valid_matches)
-            header_html = f"""<div style="display:flex; justify-content:space-between;"><div class="score-label" style="font-size:0.8rem; color:#546E7A;">{task}</div><span style='font-size:0.8rem; color:#546E7A; margin-left:5px;'>({exam_cnt} / {goal}회)</span></div>"""
-            
-            score_html = """<div style="font-size:1.5rem; color:#B0BEC5; font-weight:800;">- %</div>"""
-            if goal == 1:
-                if valid_matches:
-                    last_score = valid_matches[-1]['Score']
-                    color = "#43A047" if int(last_score) >= 90 else "#E53935"
-                    score_html = f"""<div style="font-size:1.5rem; color:{color}; font-weight:800;">{last_score}%</div>"""
-                content_html = header_html + score_html
-            else:
-                # 리스트 형태 표시
-                list_html = "<div style='margin-top:8px; display:flex; flex-direction:column; gap:4px;'>"
-                for i in range(goal):
-                    nth = i + 1
-                    if i < exam_cnt:
-                        rec = valid_matches[i]
-                        sc, dt = rec['Score'], rec['Date']
-                        c = "#43A047" if int(sc) >= 90 else "#E53935"
-                        list_html += f"""<div style="display:flex; justify-content:space-between; align-items:center; background:#F8F9FA; padding:4px 8px; border-radius:4px;"><span style="font-size:0.75rem; color:#546E7A;">#{nth}</span><span style="font-size:0.9rem; color:{c}; font-weight:800;">{sc}%</span></div>"""
-                    else:
-                        list_html += f"""<div style="display:flex; justify-content:space-between; align-items:center; border:1px dashed #ECEFF1; padding:4px 8px; border-radius:4px;"><span style="font-size:0.75rem; color:#CFD8DC;">#{nth}</span><span style="font-size:0.8rem; color:#CFD8DC;">-</span></div>"""
-                list_html += "</div>"
-                content_html = header_html + list_html
-
-            with cols[col_idx]:
-                st.markdown(f"""<div class="score-card-container" style="min-height:80px;">{content_html}</div>""", unsafe_allow_html=True)
+        cards = [
+            # 시험 점수 매칭 (범위별 정렬된 주 번호에서 이번 주 구간만 찾음)
+            render.exam_card(task, int(goal), scores_in_week(exam_index, custom, this_week_id))
+            for task, custom, goal in zip(exam_missions["Task_Name"], exam_missions["Custom_Text"], exam_missions["Weekly_Goal"])
+        ]
+        st.markdown(render.exam_section(cards), unsafe_allow_html=True)
 
     # [Section 2] 루틴 체크리스트 (속도 최적화 핵심)
     if not routine_missions.empty:
-        st.write("")
-        st.markdown("##### ✅ Checklist")
-        days = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+        show_checklist(user_id, routine_missions, this_week_id)
+
+    # [Section 3] 지난 주 기록 (열었을 때만, 고른 주 1개만 조회)
+    show_history(user_id, this_week_id)
+
+DAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+# [Fragment] 체크리스트 / 숙제 카드는 각각 따로 다시 그려지는 조각
+# - 체크박스를 누르면 스크립트 전체(스타일, 로그인, 사이드바, 시험 카드...)가 아니라 그 카드 하나만 다시 실행
+@st.fragment
+def show_checklist(user_id, routine_missions, this_week_id):
+    st.write("")
+    st.markdown("##### ✅ Checklist")
+    for index, row in routine_missions.iterrows():
+        show_task_card(user_id, index, row["Category"], row["Task_Name"], row["Custom_Text"], int(row["Weekly_Goal"]), this_week_id)
+
+@st.fragment
+def show_task_card(user_id, index, category, task_name, custom_text, goal, this_week_id):
+    full_task_name = f"{task_name} ({custom_text})"
+    # 카드만 다시 그릴 때도 최신 스냅샷 + 오버레이 사용
+    checks = session_checks(user_id, this_week_id)
+    week = week_snapshot(user_id, this_week_id)
+    
+    # 스냅샷 + 오버레이로 카운트 계산 (DB 재조회 X)
+    current = task_count(checks, week, full_task_name)
+
+    # 이 카드의 체크박스 콜백이 남긴 알림
+    toast = st.session_state.get(TOAST_KEY)
+    if toast and toast[0] == full_task_name:
+        del st.session_state[TOAST_KEY]
+        st.toast(toast[1])
+
+    with st.container(border=True):
+        st.markdown(render.task_header(category, task_name, custom_text, current, goal), unsafe_allow_html=True)
         
-        for index, row in routine_missions.iterrows():
-            task_name = row["Task_Name"]
-            custom_text = row["Custom_Text"]
-            category = row["Category"]
-            full_task_name = f"{task_name} ({custom_text})"
-            
-            try: goal = int(row.get("Weekly_Goal", 7))
-            except: goal = 7
+        d_cols = st.columns(7)
+        for i, day in enumerate(DAYS):
+            # 세션 맵에서 상태 확인 (초고속)
+            done = is_done(checks, week, full_task_name, day)
             
-            # 세션에서 카운트 조회 (DB 재조회 X)
-            current = task_counts.get(full_task_name, 0)
-            progress_text = f"({current} / {goal}회)"
-            progress_color = "#43A047" if current >= goal else "#78909C"
-
-            with st.container(border=True):
-                st.markdown(f"""
-                    <div style="display:flex; justify-content:space-between;">
-                        <div>
-                            <span class="badge-category">{category}</span>
-                            <span class="task-title" style="margin-left:5px;">{task_name}</span>
-                            <div class="task-desc">{custom_text} <span style="color:{progress_color}; font-weight:bold;">{progress_text}</span></div>
-                        </div>
-                    </div>
-                """, unsafe_allow_html=True)
-                
-                d_cols = st.columns(7)
-                for i, day in enumerate(days):
-                    # 세션 맵에서 상태 확인 (초고속)
-                    is_done = (full_task_name, day) in done_map
-                    
-                    # [중요] on_change 콜백 사용
-                    # 버튼을 누르면 DB 업데이트 후 -> 세션 업데이트 -> 화면 리프레시
-                    with d_cols[i]:
-                        st.checkbox(
-                            day, 
-                            value=is_done, 
-                            key=f"chk_{index}_{day}",
-                            on_change=toggle_status,
-                            args=(user_id, full_task_name, day, is_done)
-                        )
\ No newline at end of file
+            # [중요] on_change 콜백 사용
+            # 버튼을 누르면 세션 업데이트 -> 이 카드만 리프레시 (DB 는 백그라운드 전송)
+            chk_key = f"chk_{index}_{day}"
+            with d_cols[i]:
+                st.checkbox(
+                    day, 
+                    value=done, 
+                    key=chk_key,
+                    on_change=toggle_status,
+                    args=(user_id, full_task_name, day, chk_key, this_week_id)
+                )
+
+# ---------------------------------------------------------
+# [지난 주 기록] 주 선택 -> 그 주 기록만 조회
+# - 시트 전체/학생 전체 기록을 읽지 않음: 미러의 (학생, 주) 인덱스로 1주 분량만 (보관된 기록 포함)
+# - 조회 결과는 (학생, 주)별 공용 스냅샷 (db.get_week_logs)
+# - 주 목록은 HISTORY_PAGE_WEEKS 개씩 페이지로 나눔 (최근 주부터)
+# ---------------------------------------------------------
+HISTORY_PAGE_WEEKS = 8
+
+def history_weeks(user_id, this_week_id):
+    """고를 수 있는 지난 주 번호 목록 (최근 주부터). 기록이 없으면 []"""
+    firsts = []
+    log_range = db.get_log_week_range(user_id)
+    if log_range: firsts.append(log_range[0])
+    history = db.get_student_rows("Weekly_History", user_id)
+    if not history.empty:
+        saved = history["Week_ID"][history["Week_ID"] != weeks.NO_WEEK]
+        if not saved.empty: firsts.append(int(saved.min()))
+    if not firsts: return []
+    return list(range(this_week_id - 1, min(firsts) - 1, -1))
+
+def _week_label(wid):
+    start = weeks.week_start(wid)
+    return f"{start:%m/%d} ~ {start + timedelta(days=6):%m/%d}"
+
+def _move_history_page(step):
+    st.session_state["history_page"] = st.session_state.get("history_page", 0) + step
+
+@st.fragment
+def show_history(user_id, this_week_id):
+    st.write("")
+    if not st.toggle("📅 지난 주 기록 보기", key="history_open"):
+        return
+
+    week_list = history_weeks(user_id, this_week_id)
+    if not week_list:
+        st.caption("아직 지난 주 기록이 없습니다.")
+        return
+
+    # 페이지 (0 = 가장 최근 8주)
+    n_pages = (len(week_list) + HISTORY_PAGE_WEEKS - 1) // HISTORY_PAGE_WEEKS
+    page = min(max(st.session_state.get("history_page", 0), 0), n_pages - 1)
+    st.session_state["history_page"] = page
+    page_weeks = week_list[page * HISTORY_PAGE_WEEKS:(page + 1) * HISTORY_PAGE_WEEKS]
+
+    c_prev, c_info, c_next = st.columns([1, 3, 1])
+    with c_prev:
+        st.button("◀ 최근", key="history_newer", disabled=page == 0,
+                  on_click=_move_history_page, args=(-1,), use_container_width=True)
+    with c_info:
+        st.caption(f"{page + 1} / {n_pages} 페이지 · {_week_label(page_weeks[-1])} ~ {_week_label(page_weeks[0])}")
+    with c_next:
+        st.button("이전 ▶", key="history_older", disabled=page >= n_pages - 1,
+                  on_click=_move_history_page, args=(1,), use_container_width=True)
+
+    wid = st.radio("주 선택", page_weeks, format_func=_week_label, horizontal=True, key=f"history_week_{page}")
+
+    # 1. 그 주 체크 기록 (요일별)
+    logs = db.get_week_logs(user_id, wid)
+    if logs.empty:
+        st.info("이 주에는 체크한 기록이 없습니다.")
+    else:
+        done = set(zip(logs["Task_Name"], logs["Day_of_Week"].astype(str)))
+        tasks = list(dict.fromkeys(logs["Task_Name"]))
+        table = pd.DataFrame(
+            [{"숙제명": t, **{d: "✅" if (t, d) in done else "" for d in DAYS}, "횟수": sum((t, d) in done for d in DAYS)} for t in tasks]
+        )
+        st.dataframe(table, hide_index=True, use_container_width=True,
+                     column_config={"숙제명": st.column_config.TextColumn("Task", width="large")})
+
+    # 2. 그 주 마감 기록 (Weekly_History, 영역별 목표 대비)
+    history = db.get_student_rows("Weekly_History", user_id)
+    if not history.empty:
+        closed = history[history["Week_ID"] == wid]
+        if not closed.empty:
+            st.markdown(render.total_progress(
+                [(cat, int(done_n), int(goal)) for cat, goal, done_n in zip(closed["Category"], closed["Goal_Snapshot"], closed["Done_Snapshot"])]
+            ), unsafe_allow_html=True)
@@ -0,0 +1,415 @@
+# modules/mirror.py
+# 구글 시트(Oracle_DB)의 로컬 사본 (SQLite)
+# - 모든 조회는 이 파일에서 처리 (네트워크 왕복 X)
+# - 시트와의 동기화는 db.py 의 백그라운드 스레드가 담당
+# - 세대(version) 카운터: 시트 단위 + 학생(Student_ID) 단위
+#   내용이 실제로 바뀐 시트/학생의 카운터만 올라가므로, 캐시도 그 범위만 무효화됨
+import os
+import json
+import hashlib
+import sqlite3
+import tempfile
+import threading
+import time
+from modules import weeks
+
+MIRROR_PATH = os.environ.get(
+    "ORACLE_MIRROR_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".oracle_mirror.sqlite"),
+)
+
+# 미러 파일은 캐시이므로, 스키마가 바뀌면 통째로 다시 만듦
+SCHEMA_VERSION = 5
+
+# 시트별 조회 키 (행 번호 인덱스): 키 -> 행 번호를 시트 읽기 없이 찾기 위해 사용
+ROW_KEY_FIELDS = {
+    "Homework_Log": ("Student_ID", "Task_Name", "Day_of_Week"),
+}
+
+# 시트별 주 번호 필드 (주 인덱스): (학생, 주) 범위 조회를 시트/전체 미러 읽기 없이 하기 위해 사용
+# (필드, "time" 월 09:00 기준 | "date" 월 0시 기준)
+WEEK_FIELDS = {
+    "Homework_Log": ("Completed_At", "time"),
+    "Log_Archive": ("Completed_At", "time"),
+    "Exam_Results": ("Date", "date"),
+    "Weekly_History": ("Week_Start_Date", "date"),
+}
+
+_local = threading.local()
+_write_lock = threading.RLock()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sheets (
+    name TEXT PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0,
+    synced_at REAL NOT NULL DEFAULT 0,
+    digest TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS partitions (
+    sheet TEXT NOT NULL,
+    student_id TEXT NOT NULL,
+    version INTEGER NOT NULL DEFAULT 0,
+    digest TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (sheet, student_id)
+);
+CREATE TABLE IF NOT EXISTS rows (
+    sheet TEXT NOT NULL,
+    row_no INTEGER NOT NULL,
+    student_id TEXT NOT NULL DEFAULT '',
+    row_key TEXT,
+    week_id INTEGER,
+    record TEXT NOT NULL,
+    PRIMARY KEY (sheet, row_no)
+);
+CREATE INDEX IF NOT EXISTS idx_rows_student ON rows (sheet, student_id, row_no);
+CREATE INDEX IF NOT EXISTS idx_rows_key ON rows (sheet, row_key, row_no);
+CREATE INDEX IF NOT EXISTS idx_rows_week ON rows (sheet, student_id, week_id, row_no);
+CREATE TABLE IF NOT EXISTS stats (
+    student_id TEXT NOT NULL,
+    week_id INTEGER NOT NULL,
+    category TEXT NOT NULL,
+    live INTEGER NOT NULL,
+    seq INTEGER NOT NULL,
+    goal INTEGER NOT NULL,
+    done INTEGER NOT NULL,
+    PRIMARY KEY (student_id, week_id, category, live)
+);
+CREATE TABLE IF NOT EXISTS stats_state (
+    student_id TEXT PRIMARY KEY,
+    week_id INTEGER NOT NULL,
+    sources TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+# ---------------------------------------------------------
+# 1. 연결 (스레드별 1개)
+# ---------------------------------------------------------
+def use_temp_file():
+    """프로세스 전용 임시 파일에 미러 보관 (로컬 백엔드/테스트용: 이전 실행의 미러를 재사용하지 않음)"""
+    global MIRROR_PATH
+    fd, MIRROR_PATH = tempfile.mkstemp(prefix="oracle_mirror_", suffix=".sqlite")
+    os.close(fd)
+
+def _conn():
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(MIRROR_PATH, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            with _write_lock:
+                conn.executescript(
+                    "DROP TABLE IF EXISTS rows; DROP TABLE IF EXISTS partitions; DROP TABLE IF EXISTS sheets;"
+                    "DROP TABLE IF EXISTS stats; DROP TABLE IF EXISTS stats_state;"
+                )
+                conn.executescript(_SCHEMA)
+                conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        conn.executescript(_SCHEMA)
+        _local.conn = conn
+    return conn
+
+def _student_of(record):
+    return str(record.get("Student_ID", "")).strip()
+
+def row_key(sheet_name, values):
+    """키 필드 값들 -> 인덱스 키 문자열 (키가 없는 시트는 None)"""
+    if sheet_name not in ROW_KEY_FIELDS: return None
+    return "\x1f".join(str(v).strip() for v in values)
+
+def _key_of(sheet_name, record):
+    fields = ROW_KEY_FIELDS.get(sheet_name)
+    if not fields: return None
+    return row_key(sheet_name, [record.get(f, "") for f in fields])
+
+def _week_of(sheet_name, record):
+    if sheet_name not in WEEK_FIELDS: return None
+    field, kind = WEEK_FIELDS[sheet_name]
+    if kind == "date": return weeks.date_week_id_of_text(record.get(field, ""))
+    return weeks.week_id_of_text(record.get(field, ""))
+
+def _payload(sheet_name, first_row_no, new_records):
+    return [
+        (sheet_name, first_row_no + i, _student_of(r), _key_of(sheet_name, r), _week_of(sheet_name, r),
+         json.dumps(r, ensure_ascii=False))
+        for i, r in enumerate(new_records)
+    ]
+
+_INSERT = "INSERT INTO rows (sheet, row_no, student_id, row_key, week_id, record) VALUES (?, ?, ?, ?, ?, ?)"
+
+def _has_base(conn, sheet_name):
+    # 전체 동기화를 한 번도 안 한 시트는 부분 갱신을 건너뜀 (첫 동기화 때 통째로 받음)
+    row = conn.execute("SELECT synced_at FROM sheets WHERE name = ?", (sheet_name,)).fetchone()
+    return bool(row and row[0] > 0)
+
+def _digest(encoded_records):
+    h = hashlib.sha1()
+    for rec in encoded_records:
+        h.update(rec.encode("utf-8"))
+        h.update(b"\n")
+    return h.hexdigest()
+
+def _bump(conn, sheet_name, student_ids=()):
+    conn.execute("INSERT OR IGNORE INTO sheets (name) VALUES (?)", (sheet_name,))
+    conn.execute("UPDATE sheets SET version = version + 1, digest = '' WHERE name = ?", (sheet_name,))
+    for sid in set(student_ids):
+        conn.execute("INSERT OR IGNORE INTO partitions (sheet, student_id) VALUES (?, ?)", (sheet_name, sid))
+        conn.execute(
+            "UPDATE partitions SET version = version + 1, digest = '' WHERE sheet = ? AND student_id = ?",
+            (sheet_name, sid),
+        )
+
+# ---------------------------------------------------------
+# 2. 조회
+# ---------------------------------------------------------
+def version(sheet_name):
+    row = _conn().execute("SELECT version FROM sheets WHERE name = ?", (sheet_name,)).fetchone()
+    return row[0] if row else 0
+
+def partition_version(sheet_name, student_id):
+    row = _conn().execute(
+        "SELECT version FROM partitions WHERE sheet = ? AND student_id = ?",
+        (sheet_name, str(student_id).strip()),
+    ).fetchone()
+    return row[0] if row else 0
+
+def synced_at(sheet_name):
+    """마지막 전체 동기화 시각 (한 번도 안 했으면 0)"""
+    row = _conn().execute("SELECT synced_at FROM sheets WHERE name = ?", (sheet_name,)).fetchone()
+    return row[0] if row else 0
+
+def records(sheet_name, student_id=None):
+    """시트 순서(행 번호) 그대로 레코드 리스트 반환. student_id 지정 시 인덱스 조회."""
+    if student_id is None:
+        cur = _conn().execute("SELECT record FROM rows WHERE sheet = ? ORDER BY row_no", (sheet_name,))
+    else:
+        cur = _conn().execute(
+            "SELECT record FROM rows WHERE sheet = ? AND student_id = ? ORDER BY row_no",
+            (sheet_name, str(student_id).strip()),
+        )
+    return [json.loads(r[0]) for r in cur]
+
+def numbered_records(sheet_name, student_id=None):
+    """[(시트 행 번호, 레코드), ...] (행 번호 기반 일괄 수정용)"""
+    if student_id is None:
+        cur = _conn().execute("SELECT row_no, record FROM rows WHERE sheet = ? ORDER BY row_no", (sheet_name,))
+    else:
+        cur = _conn().execute(
+            "SELECT row_no, record FROM rows WHERE sheet = ? AND student_id = ? ORDER BY row_no",
+            (sheet_name, str(student_id).strip()),
+        )
+    return [(r[0], json.loads(r[1])) for r in cur]
+
+def week_records(sheet_name, student_id, week_id):
+    """학생 1명의 한 주 레코드 (주 인덱스 범위 조회, 시트 순서)"""
+    cur = _conn().execute(
+        "SELECT record FROM rows WHERE sheet = ? AND student_id = ? AND week_id = ? ORDER BY row_no",
+        (sheet_name, str(student_id).strip(), int(week_id)),
+    )
+    return [json.loads(r[0]) for r in cur]
+
+def week_range(sheet_name, student_id):
+    """학생 1명 기록의 (가장 이른 주, 가장 늦은 주). 없으면 None"""
+    row = _conn().execute(
+        "SELECT MIN(week_id), MAX(week_id) FROM rows WHERE sheet = ? AND student_id = ? AND week_id >= 0",
+        (sheet_name, str(student_id).strip()),
+    ).fetchone()
+    return (row[0], row[1]) if row and row[0] is not None else None
+
+def row_count(sheet_name):
+    """미러에 있는 데이터 행 수 (헤더 제외, 마지막 행 번호 기준)"""
+    row = _conn().execute("SELECT COALESCE(MAX(row_no), 1) FROM rows WHERE sheet = ?", (sheet_name,)).fetchone()
+    return row[0] - 1
+
+def last_record(sheet_name):
+    """마지막 행의 레코드 (없으면 None)"""
+    row = _conn().execute("SELECT record FROM rows WHERE sheet = ? ORDER BY row_no DESC LIMIT 1", (sheet_name,)).fetchone()
+    return json.loads(row[0]) if row else None
+
+def find_last_row(sheet_name, key_values):
+    """키가 일치하는 가장 아래 행 -> (row_no, record). 없으면 None (인덱스 조회)"""
+    row = _conn().execute(
+        "SELECT row_no, record FROM rows WHERE sheet = ? AND row_key = ? ORDER BY row_no DESC LIMIT 1",
+        (sheet_name, row_key(sheet_name, key_values)),
+    ).fetchone()
+    return (row[0], json.loads(row[1])) if row else None
+
+# ---------------------------------------------------------
+# 3. 갱신 (시트 쓰기가 성공한 뒤에만 호출)
+# ---------------------------------------------------------
+def replace_sheet(sheet_name, new_records, expected_version=None):
+    """시트 전체를 새로 받아온 내용으로 교체 (get_all_records 결과)
+    내용이 같으면 세대 카운터를 올리지 않고, 바뀐 학생 파티션만 올림.
+    expected_version: 읽기 전에 기록한 version(). 그 사이 쓰기로 바뀌었으면 받아온 내용이
+    미러보다 오래됐을 수 있으므로 교체하지 않고 False 반환 (synced_at 도 그대로 -> 다음에 다시 동기화)."""
+    payload = _payload(sheet_name, 2, new_records)
+    by_student = {}
+    for _, _, sid, _, _, rec in payload:
+        by_student.setdefault(sid, []).append(rec)
+    student_digests = {sid: _digest(recs) for sid, recs in by_student.items()}
+    sheet_digest = _digest(p[5] for p in payload)
+
+    with _write_lock:
+        conn = _conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            now = time.time()
+            conn.execute("INSERT OR IGNORE INTO sheets (name) VALUES (?)", (sheet_name,))
+            cur_version, old_digest = conn.execute("SELECT version, digest FROM sheets WHERE name = ?", (sheet_name,)).fetchone()
+            if expected_version is not None and cur_version != expected_version:
+                conn.execute("COMMIT")
+                return False
+            if old_digest == sheet_digest:
+                conn.execute("UPDATE sheets SET synced_at = ? WHERE name = ?", (now, sheet_name))
+                conn.execute("COMMIT")
+                return True
+
+            conn.execute("DELETE FROM rows WHERE sheet = ?", (sheet_name,))
+            conn.executemany(_INSERT, payload)
+
+            old_parts = dict(conn.execute("SELECT student_id, digest FROM partitions WHERE sheet = ?", (sheet_name,)))
+            for sid in set(old_parts) | set(student_digests):
+                new_digest = student_digests.get(sid, "")
+                if old_parts.get(sid) != new_digest:
+                    conn.execute("INSERT OR IGNORE INTO partitions (sheet, student_id) VALUES (?, ?)", (sheet_name, sid))
+                    conn.execute(
+                        "UPDATE partitions SET version = version + 1, digest = ? WHERE sheet = ? AND student_id = ?",
+                        (new_digest, sheet_name, sid),
+                    )
+            conn.execute(
+                "UPDATE sheets SET version = version + 1, synced_at = ?, digest = ? WHERE name = ?",
+                (now, sheet_digest, sheet_name),
+            )
+            conn.execute("COMMIT")
+            return True
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+def append_rows(sheet_name, new_records):
+    """시트 맨 아래에 추가된 행 반영"""
+    with _write_lock:
+        conn = _conn()
+        if not _has_base(conn, sheet_name): return
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            last = conn.execute("SELECT COALESCE(MAX(row_no), 1) FROM rows WHERE sheet = ?", (sheet_name,)).fetchone()[0]
+            payload = _payload(sheet_name, last + 1, new_records)
+            conn.executemany(_INSERT, payload)
+            _bump(conn, sheet_name, [p[2] for p in payload])
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+def put_rows(sheet_name, first_row_no, new_records):
+    """행 번호를 지정해서 반영 (이미 있는 행 번호는 건너뜀 -> 여러 번/여러 프로세스가 반영해도 중복 없음)
+    추가만 되는 시트(Log_Archive)의 꼬리 동기화용. 첫 반영이면 빈 시트를 기준으로 삼음."""
+    with _write_lock:
+        conn = _conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("INSERT OR IGNORE INTO sheets (name) VALUES (?)", (sheet_name,))
+            payload = _payload(sheet_name, first_row_no, new_records)
+            before = conn.total_changes
+            conn.executemany(_INSERT.replace("INSERT", "INSERT OR IGNORE", 1), payload)
+            if conn.total_changes != before:
+                _bump(conn, sheet_name, [p[2] for p in payload])
+            conn.execute("UPDATE sheets SET synced_at = ? WHERE name = ?", (time.time(), sheet_name))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+def delete_rows(sheet_name, start_row, end_row):
+    """시트에서 start_row~end_row 행이 지워졌을 때: 해당 행 삭제 + 아래 행 번호 당기기"""
+    count = end_row - start_row + 1
+    with _write_lock:
+        conn = _conn()
+        if not _has_base(conn, sheet_name): return
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            hit = conn.execute(
+                "SELECT DISTINCT student_id FROM rows WHERE sheet = ? AND row_no BETWEEN ? AND ?",
+                (sheet_name, start_row, end_row),
+            ).fetchall()
+            conn.execute("DELETE FROM rows WHERE sheet = ? AND row_no BETWEEN ? AND ?", (sheet_name, start_row, end_row))
+            # PK 충돌을 피하기 위해 음수로 한 번 뒤집었다가 되돌림
+            conn.execute("UPDATE rows SET row_no = -(row_no - ?) WHERE sheet = ? AND row_no > ?", (count, sheet_name, end_row))
+            conn.execute("UPDATE rows SET row_no = -row_no WHERE sheet = ? AND row_no < 0", (sheet_name,))
+            _bump(conn, sheet_name, [h[0] for h in hit])
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+def delete_row(sheet_name, row_no):
+    delete_rows(sheet_name, row_no, row_no)
+
+# ---------------------------------------------------------
+# 4. 학생별 통계 (student, week, category) -> goal/done (db.py 가 계산해서 저장)
+# - live=0: 마감된 주 (Weekly_History), live=1: 이번 주 (배정 + 이번 주 기록으로 계산)
+# - stats_state: 계산 당시 이번 주 번호 + 원본 시트들의 학생 세대 (다르면 다시 계산할 것)
+# ---------------------------------------------------------
+def stats_state(student_id):
+    """(week_id, sources) / 계산한 적 없으면 None"""
+    row = _conn().execute(
+        "SELECT week_id, sources FROM stats_state WHERE student_id = ?", (str(student_id).strip(),)
+    ).fetchone()
+    return (row[0], json.loads(row[1])) if row else None
+
+def stats_rows(student_id, live=None, since_week=None):
+    """[(week_id, category, live, seq, goal, done), ...] (seq, 주 순서). since_week: 그 주 이후만 (PK 범위 조회)"""
+    sql = "SELECT week_id, category, live, seq, goal, done FROM stats WHERE student_id = ?"
+    params = [str(student_id).strip()]
+    if live is not None:
+        sql += " AND live = ?"
+        params.append(int(live))
+    if since_week is not None:
+        sql += " AND week_id >= ?"
+        params.append(int(since_week))
+    return _conn().execute(sql + " ORDER BY seq, week_id", params).fetchall()
+
+def put_stats(student_id, week_id, sources, rows, live_only=False):
+    """학생 1명의 통계 교체 (live_only: 이번 주 행만 교체, 마감된 주 행은 그대로)"""
+    sid = str(student_id).strip()
+    with _write_lock:
+        conn = _conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if live_only:
+                conn.execute("DELETE FROM stats WHERE student_id = ? AND live = 1", (sid,))
+            else:
+                conn.execute("DELETE FROM stats WHERE student_id = ?", (sid,))
+            conn.executemany(
+                "INSERT INTO stats (student_id, week_id, category, live, seq, goal, done) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(sid, *r) for r in rows],
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO stats_state (student_id, week_id, sources) VALUES (?, ?, ?)",
+                (sid, int(week_id), json.dumps(sources)),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+# ---------------------------------------------------------
+# 5. 작업 상태 저장 (아카이브 워터마크 등)
+# ---------------------------------------------------------
+def get_meta(key, default=None):
+    row = _conn().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+    return json.loads(row[0]) if row else default
+
+def set_meta(key, value):
+    with _write_lock:
+        if value is None:
+            _conn().execute("DELETE FROM meta WHERE key = ?", (key,))
+        else:
+            _conn().execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                (key, json.dumps(value, ensure_ascii=False)),
+            )
@@ -0,0 +1,161 @@
+# modules/quota.py
+# 할당량(Quota)을 지키는 시트 클라이언트
+# - 구글 시트 API 한도: 사용자(서비스 계정)당 분당 읽기 60 / 쓰기 60
+# - 토큰 버킷으로 분당 호출 수를 스스로 제한: 한도에 닿으면 실패 대신 잠시 기다렸다가 호출
+# - 그래도 429/할당량 초과(또는 일시적 5xx)가 나면 지수 백오프 + 지터로 재시도
+# - status() 로 현재 사용량(한도 대비)을 확인
+import os
+import time
+import random
+import threading
+from collections import deque
+
+READS_PER_MIN = int(os.environ.get("ORACLE_READS_PER_MIN", "60"))
+WRITES_PER_MIN = int(os.environ.get("ORACLE_WRITES_PER_MIN", "60"))
+MAX_RETRIES = 5
+BACKOFF_BASE_SEC = 1.0
+BACKOFF_MAX_SEC = 32.0
+
+READ_METHODS = {"get_all_records", "get_all_values", "get", "row_values", "values_batch_get"}
+WRITE_METHODS = {"append_row", "append_rows", "delete_rows", "clear", "update", "batch_update"}
+
+# ---------------------------------------------------------
+# 1. 토큰 버킷 (프로세스 공용)
+# ---------------------------------------------------------
+class TokenBucket:
+    def __init__(self, per_minute):
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0 # 초당 충전량
+        self.tokens = float(per_minute)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+        self.calls = deque() # 최근 60초 호출 시각 (버스트 + 충전으로 분당 한도를 넘지 않도록)
+        self.waited = 0     # 토큰이 없어 기다린 횟수
+        self.wait_sec = 0.0
+        self.retries = 0    # 할당량 오류로 재시도한 횟수
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        while self.calls and self.calls[0] <= now - 60:
+            self.calls.popleft()
+
+    def acquire(self):
+        """토큰 1개 사용. 없으면 생길 때까지 대기 (실패하지 않음)"""
+        waited = False
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self.tokens >= 1 and len(self.calls) < self.capacity:
+                    self.tokens -= 1
+                    self.calls.append(now)
+                    return
+                if len(self.calls) >= self.capacity:
+                    delay = self.calls[0] + 60 - now
+                else:
+                    delay = (1 - self.tokens) / self.rate
+                if not waited:
+                    self.waited += 1
+                    waited = True
+                self.wait_sec += delay
+            time.sleep(delay)
+
+    def status(self):
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            used = len(self.calls)
+            return {
+                "limit_per_min": self.capacity,
+                "used_last_min": used,
+                "usage_ratio": used / self.capacity if self.capacity else 0.0,
+                "tokens_available": int(self.tokens),
+                "throttled_calls": self.waited,
+                "throttled_sec": round(self.wait_sec, 2),
+                "retries": self.retries,
+            }
+
+_buckets = {"read": TokenBucket(READS_PER_MIN), "write": TokenBucket(WRITES_PER_MIN)}
+
+def status():
+    """{"read": {...}, "write": {...}} : 최근 1분 사용량과 한도"""
+    return {kind: bucket.status() for kind, bucket in _buckets.items()}
+
+# ---------------------------------------------------------
+# 2. 오류 판별 + 재시도
+# ---------------------------------------------------------
+def _error_code(e):
+    code = getattr(e, "code", None)
+    if code is None:
+        response = getattr(e, "response", None)
+        code = getattr(response, "status_code", None)
+    return code
+
+def is_rejected(e):
+    """요청이 처리되지 않고 거절된 것이 확실한 오류 (429 / 사용량 한도 403, 권한 오류는 제외)"""
+    code = _error_code(e)
+    if code == 429:
+        return True
+    msg = str(e).lower()
+    return code == 403 and ("quota" in msg or "rate limit" in msg)
+
+def is_retryable(e, kind="read"):
+    # 5xx/시간 초과는 시트에 이미 반영된 뒤일 수도 있음 -> 읽기만 재시도
+    # 쓰기(행 삭제/추가, batch_update)는 되풀이하면 다른 행을 지우거나 중복되므로 그대로 올려 보냄
+    # (호출한 쪽이 다시 동기화해서 반영 여부를 확인)
+    if is_rejected(e):
+        return True
+    return kind == "read" and _error_code(e) in (500, 502, 503, 504)
+
+def call(kind, fn, *args, **kwargs):
+    bucket = _buckets[kind]
+    for attempt in range(MAX_RETRIES + 1):
+        bucket.acquire()
+        try:
+            return fn(*args, **kwargs)
+        except Exception as e:
+            if attempt >= MAX_RETRIES or not is_retryable(e, kind):
+                raise
+            with bucket.lock:
+                bucket.retries += 1
+            delay = min(BACKOFF_BASE_SEC * (2 ** attempt), BACKOFF_MAX_SEC)
+            time.sleep(delay + random.uniform(0, delay))
+
+# ---------------------------------------------------------
+# 3. 감싸기 (Spreadsheet / Worksheet 와 같은 모양)
+# ---------------------------------------------------------
+class _Throttled:
+    def __init__(self, target):
+        self._target = target
+
+    def __getattr__(self, name):
+        attr = getattr(self._target, name)
+        if name in READ_METHODS:
+            kind = "read"
+        elif name in WRITE_METHODS:
+            kind = "write"
+        else:
+            return attr
+        def wrapper(*args, **kwargs):
+            return call(kind, attr, *args, **kwargs)
+        return wrapper
+
+class QuotaWorksheet(_Throttled):
+    pass
+
+class QuotaSpreadsheet(_Throttled):
+    def __init__(self, target):
+        super().__init__(target)
+        self._worksheets = {}
+        self._lock = threading.Lock()
+
+    def worksheet(self, title):
+        with self._lock:
+            if title not in self._worksheets:
+                self._worksheets[title] = QuotaWorksheet(call("read", self._target.worksheet, title))
+            return self._worksheets[title]
+
+def wrap(doc):
+    """저장소 연결(doc)을 할당량 관리 클라이언트로 감쌈"""
+    return QuotaSpreadsheet(doc) if doc is not None else None
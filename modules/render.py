@@ -0,0 +1,179 @@
+# modules/render.py
+# HTML 렌더링 (시험 카드 / 숙제 카드 헤더 / 대시보드 요약·진행 막대) + 대시보드 차트
+# - 템플릿은 모듈을 불러올 때 1번만 컴파일 (공백 정리 + str.format 으로 바로 채움)
+# - 반복되는 조각(점수 줄, 빈 칸, 진행 막대)은 (점수, 목표, 상태) 별로 메모이즈
+# - 섹션마다 HTML 을 한 덩어리로 만들어 st.markdown 1번으로 보냄 (행마다 요소를 만들지 않음)
+# - Plotly Figure 도 입력 값(튜플)별로 메모이즈: 같은 값이면 Figure 를 다시 만들지 않음
+from functools import lru_cache
+import plotly.graph_objects as go
+
+def _compile(template):
+    """줄바꿈/들여쓰기 제거 -> 채우기 함수 (str.format)"""
+    return " ".join(template.split()).replace("> <", "><").format
+
+SCORE_GOOD = 90
+COLOR_GOOD = "#43A047"
+COLOR_BAD = "#E53935"
+
+# ---------------------------------------------------------
+# 1. 템플릿 (1번만 컴파일)
+# ---------------------------------------------------------
+_EXAM_SECTION = _compile("""
+    <div style="display:grid; grid-template-columns:repeat(2, minmax(0, 1fr)); gap:1rem;">{cards}</div>
+""")
+_EXAM_CARD = _compile("""
+    <div class="score-card-container" style="min-height:80px;">
+        <div style="display:flex; justify-content:space-between;">
+            <div class="score-label" style="font-size:0.8rem; color:#546E7A;">{task}</div>
+            <span style="font-size:0.8rem; color:#546E7A; margin-left:5px;">({count} / {goal}회)</span>
+        </div>
+        {body}
+    </div>
+""")
+_SCORE_BIG = _compile("""<div style="font-size:1.5rem; color:{color}; font-weight:800;">{score}%</div>""")
+_SCORE_LIST = _compile("""<div style="margin-top:8px; display:flex; flex-direction:column; gap:4px;">{rows}</div>""")
+_SCORE_ROW = _compile("""
+    <div style="display:flex; justify-content:space-between; align-items:center; background:#F8F9FA; padding:4px 8px; border-radius:4px;">
+        <span style="font-size:0.75rem; color:#546E7A;">#{nth}</span>
+        <span style="font-size:0.9rem; color:{color}; font-weight:800;">{score}%</span>
+    </div>
+""")
+_EMPTY_ROW = _compile("""
+    <div style="display:flex; justify-content:space-between; align-items:center; border:1px dashed #ECEFF1; padding:4px 8px; border-radius:4px;">
+        <span style="font-size:0.75rem; color:#CFD8DC;">#{nth}</span>
+        <span style="font-size:0.8rem; color:#CFD8DC;">-</span>
+    </div>
+""")
+_TASK_HEADER = _compile("""
+    <div style="display:flex; justify-content:space-between;">
+        <div>
+            <span class="badge-category">{category}</span>
+            <span class="task-title" style="margin-left:5px;">{task}</span>
+            <div class="task-desc">{custom} <span style="color:{color}; font-weight:bold;">({current} / {goal}회)</span></div>
+        </div>
+    </div>
+""")
+_WEEKLY_SUMMARY = _compile("""<div style="display:flex; gap:0.5rem;">{cells}</div>""")
+_WEEKLY_CELL = _compile("""
+    <div style="flex:1; min-width:0;">
+        <div style="text-align:center; font-size:0.8rem;">{category}</div>
+        <div style="text-align:center; font-weight:bold;">{percent}%</div>
+    </div>
+""")
+_TOTAL_ROW = _compile("""
+    <div style="margin-bottom:5px;">
+        <span style="font-weight:bold;">{category}</span>
+        <span style="float:right; font-size:0.9rem; color:#546E7A;">
+            <b>{done}</b> / {goal} <span style="color:{color}">({percent}%)</span>
+        </span>
+    </div>
+    {bar}
+    <div style="margin-bottom:15px;"></div>
+""")
+_BAR = _compile("""
+    <div style="background:#ECEFF1; border-radius:10px; height:12px; width:100%;">
+        <div style="background:{fill}; width:{width}%; height:100%; border-radius:10px;"></div>
+    </div>
+""")
+
+# ---------------------------------------------------------
+# 2. 메모이즈된 조각
+# ---------------------------------------------------------
+def _score_color(score):
+    return COLOR_GOOD if int(score) >= SCORE_GOOD else COLOR_BAD
+
+@lru_cache(maxsize=512)
+def score_big(score):
+    """목표 1회 시험: 가장 최근 점수 (score=None 이면 '- %')"""
+    if score is None: return _SCORE_BIG(color="#B0BEC5", score="-")
+    return _SCORE_BIG(color=_score_color(score), score=score)
+
+@lru_cache(maxsize=2048)
+def score_row(nth, score):
+    return _SCORE_ROW(nth=nth, color=_score_color(score), score=score)
+
+@lru_cache(maxsize=64)
+def empty_row(nth):
+    return _EMPTY_ROW(nth=nth)
+
+@lru_cache(maxsize=256)
+def progress_bar(width, reached):
+    fill = "linear-gradient(90deg, #11998e, #38ef7d)" if reached else "linear-gradient(90deg, #3498DB, #8E44AD)"
+    return _BAR(fill=fill, width=width)
+
+# ---------------------------------------------------------
+# 3. 섹션 (markdown 1번에 들어갈 HTML 한 덩어리)
+# ---------------------------------------------------------
+def exam_card(task, goal, scores):
+    """scores: 이번 주 점수 (날짜순)"""
+    if goal == 1:
+        body = score_big(scores[-1] if scores else None)
+    else:
+        body = _SCORE_LIST(rows="".join(score_row(i + 1, scores[i]) if i < len(scores) else empty_row(i + 1) for i in range(goal)))
+    return _EXAM_CARD(task=task, count=len(scores), goal=goal, body=body)
+
+def exam_section(cards):
+    """exam_card(...) 목록 -> 2열 격자"""
+    return _EXAM_SECTION(cards="".join(cards))
+
+def task_header(category, task, custom, current, goal):
+    color = COLOR_GOOD if current >= goal else "#78909C"
+    return _TASK_HEADER(category=category, task=task, custom=custom, color=color, current=current, goal=goal)
+
+def weekly_summary(rows):
+    """rows: [(카테고리, 퍼센트)]"""
+    return _WEEKLY_SUMMARY(cells="".join(_WEEKLY_CELL(category=c, percent=p) for c, p in rows))
+
+def total_progress(rows):
+    """rows: [(카테고리, 누적 완료, 누적 목표)]"""
+    out = []
+    for cat, done, goal in rows:
+        rate = done / goal if goal > 0 else 0
+        reached = rate >= 1.0
+        out.append(_TOTAL_ROW(category=cat, done=done, goal=goal, percent=int(rate * 100),
+                              color="#2ECC71" if reached else "#3498DB",
+                              bar=progress_bar(min(rate * 100, 100), reached)))
+    return "".join(out)
+
+# ---------------------------------------------------------
+# 4. 차트 (Plotly Figure, 프로세스 공용 -> 받은 쪽에서 수정하지 말 것)
+# ---------------------------------------------------------
+RADAR_CACHE_SIZE = 256
+
+@lru_cache(maxsize=RADAR_CACHE_SIZE)
+def radar_figure(categories, ratios):
+    """주간 레이더 차트. categories: 영역 튜플, ratios: 영역별 달성 비율 튜플 (1.1 까지)"""
+    cats_closed = categories + categories[:1]
+    r_goals_closed = (1.0,) * len(cats_closed)
+    r_dones_closed = ratios + ratios[:1]
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatterpolar(r=r_goals_closed, theta=cats_closed, fill='toself',
+        name='Goal', line=dict(color='#CFD8DC', dash='dot'), hoverinfo='skip'))
+    fig.add_trace(go.Scatterpolar(r=r_dones_closed, theta=cats_closed, fill='toself',
+        name='Progress', line=dict(color='#3498DB'), fillcolor='rgba(52, 152, 219, 0.6)'))
+
+    fig.update_layout(polar=dict(radialaxis=dict(visible=False, range=[0, 1.1])),
+                      showlegend=False, height=300, margin=dict(l=30, r=30, t=20, b=20))
+    return fig
+
+TREND_CACHE_SIZE = 128
+TREND_COLORS = ["#3498DB", "#2ECC71", "#E67E22", "#9B59B6", "#E74C3C", "#1ABC9C", "#34495E"]
+
+@lru_cache(maxsize=TREND_CACHE_SIZE)
+def trend_figure(unit, series):
+    """
+    영역별 달성률 추이 (선 그래프)
+    series: ((영역, (기간 문자열, ...), (달성률, ...)), ...)  unit: "week" | "month"
+    """
+    fig = go.Figure()
+    for i, (category, periods, rates) in enumerate(series):
+        fig.add_trace(go.Scatter(x=periods, y=rates, name=category, mode="lines+markers",
+            line=dict(color=TREND_COLORS[i % len(TREND_COLORS)], width=2), marker=dict(size=5),
+            hovertemplate="%{x}<br>%{y}%<extra>" + category + "</extra>"))
+    fig.add_hline(y=100, line=dict(color="#CFD8DC", dash="dot"))
+    fig.update_layout(height=320, margin=dict(l=30, r=20, t=20, b=20), hovermode="x unified",
+                      legend=dict(orientation="h", y=-0.2),
+                      xaxis=dict(tickformat="%Y-%m" if unit == "month" else "%m/%d"),
+                      yaxis=dict(ticksuffix="%", rangemode="tozero"))
+    return fig
@@ -0,0 +1,136 @@
+# modules/snapshots.py
+# 프로세스 공용 읽기 전용 스냅샷 (Snapshot) + 세션별 오버레이 (Overlay)
+# - 시트 세대(version)마다 1번만 만들고, 모든 세션이 복사 없이 같은 객체를 참조
+#   (DataFrame 은 pandas Copy-on-Write: 받은 쪽에서 수정해도 공용 객체는 안 바뀜 - pandas 3 부터 항상 켜짐,
+#    requirements.txt 에서 pandas>=3 고정, 2.x 로 실행되면 import 때 옵션으로 켬
+#    dict/set 은 MappingProxyType/frozenset 으로 만들어 둘 것)
+# - 같은 대상의 새 세대가 만들어지면 예전 세대는 바로 버림
+# - 메모리 예산(ORACLE_SNAPSHOT_BUDGET_MB)을 넘으면 가장 오래 안 쓴 스냅샷부터 버림 (다음 조회 때 다시 만듦)
+# - 세션에는 낙관적 쓰기(아직 시트에 반영 안 된 체크)만 담은 작은 Overlay 만 저장
+import os
+import sys
+import threading
+import weakref
+from collections import OrderedDict
+from types import MappingProxyType
+import pandas as pd
+
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.options.mode.copy_on_write = True # 2.x: 기본값이 꺼져 있음 (3.x 에서는 옵션 자체가 폐기 예정)
+
+BUDGET_MB = float(os.environ.get("ORACLE_SNAPSHOT_BUDGET_MB", "256"))
+
+_lock = threading.RLock()
+_store = OrderedDict()                     # (sheet, kind, key, version) -> (객체, 바이트)
+_sessions = weakref.WeakValueDictionary()  # session_id -> Overlay (세션이 끝나면 자동으로 빠짐)
+
+# ---------------------------------------------------------
+# 1. 크기 측정
+# ---------------------------------------------------------
+def sizeof(obj, _seen=None):
+    """객체가 차지하는 대략적인 바이트 수 (DataFrame 은 deep=True)"""
+    if _seen is None: _seen = set()
+    if id(obj) in _seen: return 0
+    _seen.add(id(obj))
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        usage = obj.memory_usage(deep=True)
+        return int(usage.sum() if isinstance(usage, pd.Series) else usage)
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (dict, MappingProxyType)):
+        size += sum(sizeof(k, _seen) + sizeof(v, _seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(sizeof(v, _seen) for v in obj)
+    elif hasattr(obj, "__slots__"):
+        size += sum(sizeof(getattr(obj, s), _seen) for s in obj.__slots__ if s != "__weakref__" and hasattr(obj, s))
+    return size
+
+# ---------------------------------------------------------
+# 2. 공용 스냅샷
+# ---------------------------------------------------------
+def _total():
+    return sum(nbytes for _, nbytes in _store.values())
+
+def _evict(keep):
+    # 방금 만든 스냅샷(keep)은 남기고, 오래 안 쓴 순서로 버림
+    budget = BUDGET_MB * 1024 * 1024
+    total = _total()
+    for ident in list(_store):
+        if total <= budget: break
+        if ident == keep: continue
+        total -= _store.pop(ident)[1]
+
+def get(sheet_name, kind, version, build, key=None):
+    """
+    (sheet_name, kind, key) 의 version 세대 스냅샷. 없으면 build() 로 1번 만들어 공유.
+    - kind: "frame"(시트 전체), "partitions"(학생별 dict), "week"(학생 1명의 파생 데이터) 등
+    """
+    ident = (sheet_name, kind, key, version)
+    with _lock:
+        hit = _store.get(ident)
+        if hit is not None:
+            _store.move_to_end(ident)
+            return hit[0]
+    obj = build()
+    nbytes = sizeof(obj)
+    with _lock:
+        for old in [k for k in _store if k[:3] == ident[:3] and k != ident]:
+            del _store[old]
+        _store[ident] = (obj, nbytes)
+        _evict(ident)
+    return obj
+
+def clear():
+    with _lock:
+        _store.clear()
+
+# ---------------------------------------------------------
+# 3. 세션별 오버레이
+# ---------------------------------------------------------
+class Overlay:
+    """세션 1개의 낙관적 쓰기. data 의 모양은 쓰는 쪽이 정함."""
+    __slots__ = ("owner", "data", "__weakref__")
+
+    def __init__(self, owner, data=None):
+        self.owner = owner
+        self.data = {} if data is None else data
+
+def overlay(session_state, name, owner, init=None):
+    """session_state[name] 의 Overlay (없거나 주인이 바뀌었으면 새로 만들어 등록)"""
+    ov = session_state.get(name)
+    if not isinstance(ov, Overlay) or ov.owner != owner:
+        ov = Overlay(owner, init() if init else None)
+        session_state[name] = ov
+        with _lock:
+            _sessions[_session_id(name)] = ov
+    return ov
+
+def _session_id(name):
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        ctx = get_script_run_ctx()
+        sid = ctx.session_id if ctx else "bare"
+    except Exception:
+        sid = "bare"
+    return f"{sid}:{name}"
+
+# ---------------------------------------------------------
+# 4. 메모리 보고
+# ---------------------------------------------------------
+def report():
+    """
+    {"budget_bytes", "total_bytes", "entries",
+     "sheets": {시트: 공용 스냅샷 바이트}, "sessions": {세션: 오버레이 바이트}, "session_total_bytes"}
+    """
+    with _lock:
+        sheets = {}
+        for (sheet_name, _, _, _), (_, nbytes) in _store.items():
+            sheets[sheet_name] = sheets.get(sheet_name, 0) + nbytes
+        sessions = {sid: sizeof(ov) for sid, ov in list(_sessions.items())}
+        return {
+            "budget_bytes": int(BUDGET_MB * 1024 * 1024),
+            "total_bytes": _total(),
+            "entries": len(_store),
+            "sheets": sheets,
+            "sessions": sessions,
+            "session_total_bytes": sum(sessions.values()),
+        }
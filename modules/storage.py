@@ -0,0 +1,300 @@
+# modules/storage.py
+# 저장소 백엔드 (Storage Backend)
+# - db.py 가 실제로 쓰는 시트 작업만 정의: 아래 Spreadsheet / Worksheet 인터페이스
+# - 구현 1) Sheets : gspread (운영용, gspread 객체가 그대로 인터페이스를 만족)
+# - 구현 2) Local  : 메모리 위의 가짜 스프레드시트 (구글 인증/네트워크 없이 측정·부하 테스트용)
+#                   호출마다 지연(latency)과 분당 할당량(quota)을 흉내 냄
+#
+# 사용 예) ORACLE_BACKEND=local ORACLE_LOCAL_LATENCY_MS=300 streamlit run app.py
+import os
+import re
+import time
+import random
+import threading
+from collections import deque
+from typing import Protocol
+from datetime import datetime, timedelta
+import gspread
+from gspread.utils import numericise_all
+from google.oauth2.service_account import Credentials
+
+SCOPES = [
+    "https://www.googleapis.com/auth/spreadsheets",
+    "https://www.googleapis.com/auth/drive",
+]
+
+# ---------------------------------------------------------
+# 1. 인터페이스 (db.py 가 사용하는 작업 목록)
+# ---------------------------------------------------------
+# typing.Protocol: 구조적 타입 - gspread 객체는 상속 없이 메서드가 같아서 만족
+class Worksheet(Protocol):
+    """워크시트 1개. 행 번호는 시트와 같이 1부터 (1행 = 헤더)."""
+    title: str
+    id: int
+
+    def get_all_records(self): ...
+    def get_all_values(self): ...
+    def get(self, range_name): ...          # 예: "A2:E501"
+    def row_values(self, row): ...
+    def append_row(self, values): ...
+    def append_rows(self, values): ...
+    def delete_rows(self, start_index, end_index=None): ...
+    def clear(self): ...
+
+class Spreadsheet(Protocol):
+    """스프레드시트(문서) 1개"""
+    def worksheet(self, title): ...
+    def batch_update(self, body): ...      # Sheets API batchUpdate 요청 형식
+    # 여러 범위를 요청 1번으로 읽기. ranges 예: ["'Users'", "'Homework_Log'!A2:E501"]
+    # 반환: {"valueRanges": [{"range": ..., "values": [[...], ...]}, ...]} (ranges 순서)
+    def values_batch_get(self, ranges): ...
+
+# ---------------------------------------------------------
+# 2. 구현 1: Google Sheets (gspread)
+# ---------------------------------------------------------
+def open_sheets(creds_dict, name="Oracle_DB"):
+    creds = Credentials.from_service_account_info(creds_dict, scopes=SCOPES)
+    client = gspread.authorize(creds)
+    return client.open(name)
+
+# ---------------------------------------------------------
+# 3. 구현 2: Local (메모리, 지연/할당량 흉내)
+# ---------------------------------------------------------
+LOCAL_LATENCY_MS = float(os.environ.get("ORACLE_LOCAL_LATENCY_MS", "0"))
+LOCAL_JITTER_MS = float(os.environ.get("ORACLE_LOCAL_JITTER_MS", "0"))
+LOCAL_READS_PER_MIN = int(os.environ.get("ORACLE_LOCAL_READS_PER_MIN", "60"))     # 구글 기본: 사용자당 분당 60
+LOCAL_WRITES_PER_MIN = int(os.environ.get("ORACLE_LOCAL_WRITES_PER_MIN", "60"))
+
+# 운영 시트와 같은 헤더
+LOCAL_HEADERS = {
+    "Users": ["Student_ID", "Name", "Password", "Role", "Start_Date"],
+    "Homework_List": ["Student_ID", "Category", "Task_Name", "Custom_Text", "Weekly_Goal"],
+    "Homework_Log": ["Student_ID", "Task_Name", "Completed_At", "Day_of_Week", "Log_ID"],
+    "Exam_Results": ["Student_ID", "Range", "Score", "Date"],
+    "Weekly_History": ["Student_ID", "Week_Start_Date", "Category", "Goal_Snapshot", "Done_Snapshot"],
+    "Log_Archive": ["Student_ID", "Task_Name", "Completed_At", "Day_of_Week", "Log_ID"],
+}
+
+class LocalAPIError(Exception):
+    """gspread.exceptions.APIError 처럼 code 를 가진 예외 (429 = 할당량 초과)"""
+    def __init__(self, code, message):
+        super().__init__(f"[{code}] {message}")
+        self.code = code
+
+class _Quota:
+    """분당 호출 수 제한 (최근 60초 슬라이딩 윈도우)"""
+    def __init__(self, reads_per_min, writes_per_min):
+        self.limits = {"read": reads_per_min, "write": writes_per_min}
+        self.calls = {"read": deque(), "write": deque()}
+        self.counts = {"read": 0, "write": 0}
+        self.lock = threading.Lock()
+
+    def spend(self, kind):
+        now = time.time()
+        with self.lock:
+            window = self.calls[kind]
+            while window and window[0] <= now - 60:
+                window.popleft()
+            if self.limits[kind] and len(window) >= self.limits[kind]:
+                raise LocalAPIError(429, f"Quota exceeded for quota metric '{kind} requests' per minute")
+            window.append(now)
+            self.counts[kind] += 1
+
+class LocalWorksheet(Worksheet):
+    def __init__(self, spreadsheet, title, sheet_id, header):
+        self._doc = spreadsheet
+        self.title = title
+        self.id = sheet_id
+        self._rows = [[str(h) for h in header]] if header else []
+
+    def _call(self, kind):
+        self._doc._call(kind)
+
+    def _width(self):
+        return max((len(r) for r in self._rows), default=0)
+
+    def _padded(self, rows):
+        width = self._width()
+        return [list(r) + [""] * (width - len(r)) for r in rows]
+
+    # --- 읽기 ---
+    def get_all_values(self):
+        self._call("read")
+        return self._padded(self._rows)
+
+    def get_all_records(self):
+        self._call("read")
+        if not self._rows: return []
+        rows = self._padded(self._rows)
+        header = rows[0]
+        return [dict(zip(header, numericise_all(r))) for r in rows[1:]]
+
+    def get(self, range_name):
+        self._call("read")
+        return self._values(range_name)
+
+    def _values(self, range_name=None):
+        # 범위가 없으면 시트 전체. API 처럼 행 끝/맨 아래의 빈 칸은 잘라서 반환
+        if range_name is None:
+            rows = [list(r) for r in self._rows]
+            for cells in rows:
+                while cells and cells[-1] == "": cells.pop()
+            while rows and not rows[-1]: rows.pop()
+            return rows
+        m = re.match(r"^([A-Z]+)(\d+):([A-Z]+)(\d+)$", range_name)
+        if not m: raise LocalAPIError(400, f"Unsupported range: {range_name}")
+        c1, r1, c2, r2 = _col_index(m.group(1)), int(m.group(2)), _col_index(m.group(3)), int(m.group(4))
+        out = []
+        for r in self._rows[r1 - 1:r2]:
+            cells = r[c1 - 1:c2]
+            while cells and cells[-1] == "": cells = cells[:-1]
+            out.append(cells)
+        while out and not out[-1]: out.pop()
+        return out
+
+    def row_values(self, row):
+        self._call("read")
+        if row - 1 >= len(self._rows): return []
+        cells = list(self._rows[row - 1])
+        while cells and cells[-1] == "": cells.pop()
+        return cells
+
+    # --- 쓰기 ---
+    def append_row(self, values):
+        self._call("write")
+        self._rows.append([_cell_str(v) for v in values])
+
+    def append_rows(self, values):
+        self._call("write")
+        self._rows.extend([_cell_str(v) for v in row] for row in values)
+
+    def delete_rows(self, start_index, end_index=None):
+        self._call("write")
+        end_index = end_index or start_index
+        del self._rows[start_index - 1:end_index]
+
+    def clear(self):
+        self._call("write")
+        self._rows = []
+
+class LocalSpreadsheet(Spreadsheet):
+    def __init__(self, title="Oracle_DB", latency_ms=LOCAL_LATENCY_MS, jitter_ms=LOCAL_JITTER_MS,
+                 reads_per_min=LOCAL_READS_PER_MIN, writes_per_min=LOCAL_WRITES_PER_MIN):
+        self.title = title
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.quota = _Quota(reads_per_min, writes_per_min)
+        self._sheets = {}
+        for i, (name, header) in enumerate(LOCAL_HEADERS.items()):
+            self._sheets[name] = LocalWorksheet(self, name, i + 1, header)
+
+    def _call(self, kind):
+        self.quota.spend(kind)
+        delay = self.latency_ms + random.uniform(0, self.jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000.0)
+
+    def api_calls(self):
+        """지금까지의 호출 수 {"read": n, "write": n} (측정용)"""
+        return dict(self.quota.counts)
+
+    def worksheet(self, title):
+        if title not in self._sheets:
+            raise gspread.exceptions.WorksheetNotFound(title)
+        return self._sheets[title]
+
+    def values_batch_get(self, ranges):
+        self._call("read")
+        out = []
+        for rng in ranges:
+            m = re.match(r"^'?(.*?)'?(?:!([A-Z]+\d+:[A-Z]+\d+))?$", rng)
+            out.append({"range": rng, "values": self.worksheet(m.group(1))._values(m.group(2))})
+        return {"valueRanges": out}
+
+    def batch_update(self, body):
+        self._call("write")
+        by_id = {ws.id: ws for ws in self._sheets.values()}
+        for req in body.get("requests", []):
+            (kind, spec), = req.items()
+            if kind == "updateCells":
+                rng = spec["range"]
+                ws = by_id[rng["sheetId"]]
+                for offset, row in enumerate(spec["rows"]):
+                    r = rng["startRowIndex"] + offset
+                    while len(ws._rows) <= r: ws._rows.append([])
+                    cells = ws._rows[r]
+                    c0 = rng.get("startColumnIndex", 0)
+                    values = [_cell_value(c) for c in row["values"]]
+                    cells.extend([""] * (c0 + len(values) - len(cells)))
+                    cells[c0:c0 + len(values)] = values
+            elif kind == "deleteDimension":
+                rng = spec["range"]
+                del by_id[rng["sheetId"]]._rows[rng["startIndex"]:rng["endIndex"]]
+            elif kind == "appendCells":
+                ws = by_id[spec["sheetId"]]
+                ws._rows.extend([_cell_value(c) for c in row["values"]] for row in spec["rows"])
+            else:
+                raise LocalAPIError(400, f"Unsupported request: {kind}")
+        return {"replies": []}
+
+def _col_index(letters):
+    n = 0
+    for ch in letters:
+        n = n * 26 + (ord(ch) - ord("A") + 1)
+    return n
+
+def _cell_str(value):
+    return "" if value is None else str(value)
+
+def _cell_value(cell):
+    v = cell.get("userEnteredValue", {})
+    if "numberValue" in v:
+        num = v["numberValue"]
+        return str(int(num)) if float(num).is_integer() else str(num)
+    return _cell_str(v.get("stringValue", v.get("boolValue", "")))
+
+def open_local(**kwargs):
+    """빈 로컬 스프레드시트 (ORACLE_LOCAL_SEED_STUDENTS 가 있으면 데모 데이터로 채움)"""
+    doc = LocalSpreadsheet(**kwargs)
+    students = int(os.environ.get("ORACLE_LOCAL_SEED_STUDENTS", "0"))
+    if students:
+        seed_demo(doc, students=students, weeks=int(os.environ.get("ORACLE_LOCAL_SEED_WEEKS", "8")))
+    return doc
+
+# ---------------------------------------------------------
+# 4. 데모 데이터 (부하 테스트용)
+# ---------------------------------------------------------
+DEMO_TASKS = [
+    ("듣기", "백지 딕테이션", "20분 내외", 2),
+    ("문법", "문법 교재", "복습", 2),
+    ("단어", "단어 암기", "001~100", 5),
+    ("단어", "단어 시험", "001~100", 2),
+    ("모의고사", "모의고사 (65분)", "고3 1회", 1),
+    ("모의고사", "구조화", "수업분", 1),
+]
+DAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+def seed_demo(doc, students=40, weeks=8, seed=0):
+    """교사 1명 + 학생 N명, 최근 weeks 주 분량의 숙제/기록/시험 생성 (할당량/지연 없이 직접 기록)"""
+    rng = random.Random(seed)
+    now = datetime.now()
+    start = now - timedelta(weeks=weeks)
+    users = [["T001", "Teacher", "admin", "teacher", ""]]
+    hw, logs, exams = [], [], []
+    for i in range(students):
+        sid = str(1001 + i)
+        users.append([sid, f"Student{i + 1}", "1234", "student", start.strftime("%Y-%m-%d")])
+        for cat, task, custom, goal in DEMO_TASKS:
+            if rng.random() < 0.8:
+                hw.append([sid, cat, task, custom, goal])
+                if "시험" in task: continue
+                for _ in range(weeks * goal):
+                    ts = start + timedelta(seconds=rng.randint(0, int((now - start).total_seconds())))
+                    logs.append([sid, f"{task} ({custom})", ts.strftime("%Y-%m-%d %H:%M:%S"), DAYS[ts.weekday()], f"{rng.getrandbits(48):012x}"])
+        for _ in range(weeks * 2):
+            day = start + timedelta(days=rng.randint(0, (now - start).days))
+            exams.append([sid, "001~100", rng.choice([70, 80, 90, 95, 100]), day.strftime("%Y-%m-%d")])
+    logs.sort(key=lambda r: r[2])
+    for name, rows in [("Users", users), ("Homework_List", hw), ("Homework_Log", logs), ("Exam_Results", exams)]:
+        doc._sheets[name]._rows.extend([_cell_str(v) for v in r] for r in rows)
+    return doc
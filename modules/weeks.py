@@ -0,0 +1,66 @@
+# modules/weeks.py
+# 주간 달력 (Week Calendar) - 한 주 = 월요일 09:00 (KST) ~ 다음 월요일 09:00
+# - 모든 페이지/작업이 이 모듈 하나로 "이번 주"를 계산 (서버 시간대와 무관하게 KST)
+# - 주 번호(Week ID): 기준 월요일부터 몇 번째 주인지 나타내는 정수
+#   -> "이번 주", "N번째 주" 필터는 날짜 비교 대신 정수 비교/그룹으로 처리
+# - 수행 기록(Completed_At)은 월요일 09:00 기준, 날짜만 있는 값(시험 Date, Week_Start_Date)은 월요일 0시 기준
+#   (같은 주라면 둘 다 같은 번호)
+from datetime import datetime, timedelta
+import pytz
+import pandas as pd
+
+KST = pytz.timezone('Asia/Seoul')
+RESET_HOUR = 9
+NO_WEEK = -1 # 날짜가 없거나 잘못된 행
+
+_EPOCH_DATE = pd.Timestamp("1970-01-05")             # 월요일 (Week ID 0)
+_EPOCH = _EPOCH_DATE + pd.Timedelta(hours=RESET_HOUR)
+_WEEK = pd.Timedelta(days=7)
+
+def now():
+    return datetime.now(KST)
+
+def current_week_start():
+    """이번 주 월요일 09:00 (KST, tz-aware)"""
+    t = now()
+    days_to_subtract = 7 if t.weekday() == 0 and t.hour < RESET_HOUR else t.weekday()
+    last_monday = t - timedelta(days=days_to_subtract)
+    return last_monday.replace(hour=RESET_HOUR, minute=0, second=0, microsecond=0)
+
+def week_id(ts):
+    """날짜/시각(naive KST) 1개 -> 주 번호 (월요일 09:00 기준)"""
+    if ts is None or pd.isna(ts): return NO_WEEK
+    return int((pd.Timestamp(ts) - _EPOCH) // _WEEK)
+
+_EPOCH_PY = _EPOCH.to_pydatetime()
+_EPOCH_DATE_PY = _EPOCH_DATE.to_pydatetime()
+_WEEK_PY = timedelta(days=7)
+
+def week_id_of_text(text, fmt="%Y-%m-%d %H:%M:%S"):
+    """시트의 시각 문자열 1개 -> 주 번호 (pandas 없이, 미러 색인용). 형식이 다르면 NO_WEEK"""
+    try:
+        return (datetime.strptime(str(text).strip(), fmt) - _EPOCH_PY) // _WEEK_PY
+    except ValueError:
+        return NO_WEEK
+
+def date_week_id_of_text(text, fmt="%Y-%m-%d"):
+    """시트의 날짜 문자열 1개 -> 주 번호 (월요일 0시 기준). 형식이 다르면 NO_WEEK"""
+    try:
+        return (datetime.strptime(str(text).strip(), fmt) - _EPOCH_DATE_PY) // _WEEK_PY
+    except ValueError:
+        return NO_WEEK
+
+def current_week_id():
+    return week_id(current_week_start().replace(tzinfo=None))
+
+def week_start(wid):
+    """주 번호 -> 그 주 월요일 09:00 (naive KST)"""
+    return (_EPOCH + wid * _WEEK).to_pydatetime()
+
+def week_ids(times):
+    """datetime64 Series -> 주 번호 int64 Series (월요일 09:00 기준, NaT 는 NO_WEEK)"""
+    return ((times - _EPOCH) // _WEEK).fillna(NO_WEEK).astype("int64")
+
+def date_week_ids(dates):
+    """날짜(0시) datetime64 Series -> 주 번호 int64 Series (월요일 0시 기준, NaT 는 NO_WEEK)"""
+    return ((dates - _EPOCH_DATE) // _WEEK).fillna(NO_WEEK).astype("int64")
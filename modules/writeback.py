@@ -0,0 +1,116 @@
+# modules/writeback.py
+# 체크리스트 토글 전용 쓰기 지연(Write-Behind) 큐
+# - 체크박스 콜백은 큐에 넣기만 하고 즉시 반환 (화면은 세션의 낙관적 업데이트로 갱신)
+# - 백그라운드 워커가 모아서 전송: 같은 (학생, 숙제, 요일)의 on/off 반복은 하나로 합침
+# - 추가(append)는 한 번의 append_rows 로 묶고, 실패하면 지수 백오프로 재시도
+import streamlit as st
+import threading
+import time
+import random
+import atexit
+from modules import db, weeks
+
+FLUSH_INTERVAL_SEC = 2.0   # 최대 대기 시간 (이 주기마다 한 번은 전송)
+DEBOUNCE_SEC = 0.5         # 클릭 직후 잠깐 기다려 연속 클릭을 한 번에 모음
+MAX_ATTEMPTS = 6
+BACKOFF_BASE_SEC = 1.0
+
+_lock = threading.Lock()
+_flush_lock = threading.Lock()
+_wake = threading.Event()
+
+# (student_id, task_name, day) -> {"base": 시트의 현재 상태, "want": 원하는 상태, "ts": 체크한 시각 (KST),
+#                                  "attempts", "not_before"}
+_pending = {}
+
+# ---------------------------------------------------------
+# 1. 큐 적재 (UI 콜백에서 호출, 네트워크 X)
+# ---------------------------------------------------------
+def enqueue_toggle(student_id, task_name, day, was_done, now_done):
+    key = (str(student_id), task_name, day)
+    # 완료 시각은 전송 시점이 아니라 클릭 시점 (마지막으로 체크한 시각)
+    ts = weeks.now().strftime("%Y-%m-%d %H:%M:%S")
+    with _lock:
+        item = _pending.get(key)
+        if item is None:
+            _pending[key] = {"base": was_done, "want": now_done, "ts": ts, "attempts": 0, "not_before": 0.0}
+        else:
+            item["want"] = now_done
+            if now_done: item["ts"] = ts
+    start_worker()
+    _wake.set()
+
+def pending_states(student_id):
+    """아직 전송되지 않은 변경 {(task_name, day): 원하는 상태} (세션 재로딩 시 덮어쓰기용)"""
+    sid = str(student_id)
+    with _lock:
+        return {(k[1], k[2]): v["want"] for k, v in _pending.items() if k[0] == sid}
+
+def pending_count():
+    with _lock:
+        return len(_pending)
+
+# ---------------------------------------------------------
+# 2. 전송 (워커 스레드)
+# ---------------------------------------------------------
+def _requeue(key, item):
+    item["attempts"] += 1
+    if item["attempts"] >= MAX_ATTEMPTS:
+        print(f"Write-Behind 포기 {key}: {item['attempts']}회 실패")
+        return
+    delay = BACKOFF_BASE_SEC * (2 ** (item["attempts"] - 1))
+    item["not_before"] = time.time() + delay + random.uniform(0, delay)
+    with _lock:
+        newer = _pending.get(key)
+        if newer is None:
+            _pending[key] = item
+        else:
+            # 전송 실패 중에 또 클릭된 경우: 시트는 여전히 예전 상태(base)
+            newer["base"] = item["base"]
+            newer["attempts"] = item["attempts"]
+            newer["not_before"] = item["not_before"]
+
+def flush():
+    """전송 가능한 항목을 모두 내보냄. 실제로 보낸 API 작업 수 반환."""
+    with _flush_lock:
+        now = time.time()
+        with _lock:
+            ready = {k: v for k, v in _pending.items() if v["not_before"] <= now}
+            for k in ready:
+                del _pending[k]
+
+        appends = [(k, v) for k, v in ready.items() if v["want"] and not v["base"]]
+        deletes = [(k, v) for k, v in ready.items() if v["base"] and not v["want"]]
+        # want == base 인 항목(켰다 껐다)은 여기서 사라짐
+
+        sent = 0
+        if appends:
+            sent += 1
+            if not db.add_homework_logs([(*k, v["ts"]) for k, v in appends]):
+                for k, v in appends: _requeue(k, v)
+        for k, v in deletes:
+            sent += 1
+            if not db.delete_homework_log(*k):
+                _requeue(k, v)
+        return sent
+
+def _worker_loop():
+    while True:
+        _wake.wait(FLUSH_INTERVAL_SEC)
+        if _wake.is_set():
+            time.sleep(DEBOUNCE_SEC)
+            _wake.clear()
+        try:
+            flush()
+        except Exception as e:
+            print(f"Write-Behind Error: {e}")
+
+@st.cache_resource
+def start_worker():
+    """프로세스당 1개의 전송 워커 실행"""
+    worker = threading.Thread(target=_worker_loop, name="oracle-writeback", daemon=True)
+    worker.start()
+    return worker
+
+# 프로세스 종료 시 남은 항목을 최대한 전송
+atexit.register(lambda: _pending and flush())
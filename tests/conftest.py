@@ -0,0 +1,10 @@
+# tests/conftest.py
+# 테스트는 로컬 백엔드(메모리 가짜 시트, modules/storage.py)로 실행: 구글 시트/인증 없이
+# (modules.db 를 import 하기 전에 설정해야 함)
+import os
+import sys
+
+os.environ.setdefault("ORACLE_BACKEND", "local")
+os.environ.setdefault("ORACLE_LOCAL_READS_PER_MIN", "0")   # 0 = 제한 없음
+os.environ.setdefault("ORACLE_LOCAL_WRITES_PER_MIN", "0")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
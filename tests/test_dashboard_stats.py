@@ -0,0 +1,48 @@
+# tests/test_dashboard_stats.py
+# 대시보드 통계(db.get_student_stats)가 원래 show_dashboard 의 집계와 같은지 확인
+# - 비교 기준: bench.original_dashboard_stats (열 단위 집계 이전의 show_dashboard 집계 그대로)
+# - 입력: bench.bench_records 가 만든 레코드를 로컬 시트에 적고, 양쪽이 같은 시트를 읽음
+import random
+
+import pytest
+
+from modules import bench, db, storage, weeks
+
+STAT_KEYS = ["weekly_goal", "weekly_done", "total_goal", "total_done"]
+SOURCES = ["Homework_List", "Homework_Log", "Exam_Results", "Weekly_History"]
+WEEK_COUNTS = [1, 10, 50]
+STUDENTS_PER_CASE = 5
+
+@pytest.fixture(scope="module")
+def students():
+    """WEEK_COUNTS 마다 STUDENTS_PER_CASE 명을 로컬 시트에 적고 미러를 다시 동기화 -> {주 수: [학생 ID]}"""
+    rng = random.Random(0)
+    this_week_id = weeks.current_week_id()
+    rows = {name: [] for name in SOURCES}
+    cases = {}
+    next_id = 2001
+    for n_weeks in WEEK_COUNTS:
+        cases[n_weeks] = []
+        for _ in range(STUDENTS_PER_CASE):
+            sid = str(next_id); next_id += 1
+            records = bench.bench_records(rng, n_weeks, this_week_id, sid)
+            for name in SOURCES:
+                rows[name] += [[r[h] for h in storage.LOCAL_HEADERS[name]] for r in records[name]]
+            cases[n_weeks].append(sid)
+    for name in SOURCES:
+        db.doc.worksheet(name).append_rows(rows[name])
+    db.sync_sheets(SOURCES) # import 때 동기화 스레드가 빈 시트를 먼저 읽었을 수 있음
+    return cases
+
+@pytest.mark.parametrize("n_weeks", WEEK_COUNTS)
+def test_stats_match_original_dashboard(students, n_weeks):
+    sheets = {name: db.doc.worksheet(name).get_all_records() for name in SOURCES}
+    week_start = weeks.week_start(weeks.current_week_id())
+    for sid in students[n_weeks]:
+        history = [r for r in sheets["Weekly_History"] if str(r.get("Student_ID")) == sid] # 원래 get_weekly_history
+        expected = bench.original_dashboard_stats(sid, sheets["Homework_List"], sheets["Homework_Log"],
+                                                  sheets["Exam_Results"], history, week_start)
+        actual = {c: {k: v[k] for k in STAT_KEYS} for c, v in db.get_student_stats(sid).items()}
+        assert expected, sid
+        # 값과 영역(표시) 순서까지 같아야 함
+        assert list(actual.items()) == list(expected.items()), sid